@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Data Quest benchmarks.
+
+Times the collection-based exercises against their scaled-up
+alternatives on synthetic data. Suites are named on the command line.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+BASE = Path(__file__).resolve().parent
+
+
+def load(relative: str) -> ModuleType:
+    """Import an exercise file by path (exN folders are not packages)."""
+    path = BASE / relative
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def report(label: str, size: int, seconds: float,
+           unit: str = "players") -> None:
+    rate = size / seconds if seconds else float("inf")
+    print(f"  {label:<24} {seconds:>9.4f}s {rate:>14,.0f} {unit}/s")
+
+
+def set_queries(players: list[set]) -> None:
+    """The tracker's original chains: one union of the others per player."""
+    everything = set().union(*players)
+    set.intersection(*players)
+    for i, player in enumerate(players):
+        player.difference(set().union(*players[:i], *players[i + 1:]))
+    for player in players:
+        everything.difference(player)
+
+
+def bench_achievements(sizes: list[int]) -> None:
+    ex3 = load("ex3/ft_achievement_tracker.py")
+    registry = ex3.AchievementRegistry(ex3.achievements)
+    quadratic_limit = 10 ** 3
+
+    print("== Achievement queries (sets vs bitmasks) ==")
+    for size in sizes:
+        print(f"{size:,} players")
+        random.seed(42)
+        players = [ex3.gen_player_achievement() for _ in range(size)]
+        masks = [registry.mask(player) for player in players]
+
+        def bitmask_queries(masks: Any = masks) -> None:
+            ex3.union_all(masks)
+            ex3.common_all(masks)
+            ex3.only_masks(masks)
+            ex3.missing_masks(masks)
+
+        if size > quadratic_limit:
+            print(f"  {'sets':<24} skipped (quadratic 'only' chains)")
+        else:
+            report("sets", size, timed(lambda: set_queries(players)))
+        report("int bitmasks", size, timed(bitmask_queries))
+        if ex3.np is not None:
+            array = registry.to_array(masks)
+            report("uint64 ndarray", size,
+                   timed(lambda: bitmask_queries(array)))
+
+
+def bench_inventory(sizes: list[int], updates: int = 10 ** 5,
+                    query_every: int = 100) -> None:
+    ex4 = load("ex4/ft_inventory_system.py")
+    rescan_limit = 10 ** 4
+
+    print(f"== Inventory: {updates:,} updates, total/min/max every "
+          f"{query_every} (rescans vs Inventory) ==")
+    for size in sizes:
+        print(f"{size:,} SKUs")
+        rng = random.Random(42)
+        items = {f"sku{i}": rng.randint(1, 10 ** 6) for i in range(size)}
+        changes = [(f"sku{rng.randrange(size)}", rng.randint(1, 10 ** 6))
+                   for _ in range(updates)]
+
+        def rescans() -> None:
+            inventory = dict(items)
+            for step, (name, qty) in enumerate(changes):
+                inventory[name] = qty
+                if step % query_every == 0:
+                    sum(inventory.values())
+                    max(inventory.items(), key=lambda item: item[1])
+                    min(inventory.items(), key=lambda item: item[1])
+
+        def incremental() -> None:
+            inventory = ex4.Inventory(items)
+            for step, (name, qty) in enumerate(changes):
+                inventory[name] = qty
+                if step % query_every == 0:
+                    inventory.total
+                    inventory.max_item()
+                    inventory.min_item()
+
+        if size > rescan_limit:
+            print(f"  {'dict rescans':<24} skipped (O(n) per query)")
+        else:
+            report("dict rescans", updates, timed(rescans), "updates")
+        report("Inventory", updates, timed(incremental), "updates")
+
+
+def bench_parse(sizes: list[int], dirty: float = 0.01) -> None:
+    ex4 = load("ex4/ft_inventory_system.py")
+
+    print(f"== name:qty parsing (parse_args vs parse_stream), "
+          f"{dirty:.0%} bad records in 'dirty' ==")
+    for size in sizes:
+        print(f"{size:,} records")
+        rng = random.Random(42)
+        clean = [f"sku{i}:{rng.randint(0, 10 ** 6)}" for i in range(size)]
+        bad = [f"sku{i}:x{rng.randint(0, 9)}" if rng.random() < dirty
+               else record for i, record in enumerate(clean)]
+        for label, records in (("clean", clean), ("dirty", bad)):
+            text = "\n".join(records) + "\n"
+
+            def per_token() -> None:
+                with open(os.devnull, "w") as sink, \
+                        contextlib.redirect_stdout(sink):
+                    ex4.parse_args(text.split())
+
+            report(f"{label} parse_args", size, timed(per_token), "records")
+            report(f"{label} parse_stream", size,
+                   timed(lambda: ex4.parse_stream(io.StringIO(text))),
+                   "records")
+
+
+SUITES = ("achievements", "inventory", "parse")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Data Quest benchmarks")
+    parser.add_argument("suites", nargs="*", metavar="suite",
+                        help=f"one of {', '.join(SUITES)} (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        help="number of players/records per run")
+    args = parser.parse_args()
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+    suites = args.suites or list(SUITES)
+
+    print("=== Data Quest - Benchmark ===")
+    if "achievements" in suites:
+        bench_achievements(args.sizes or [10 ** 3, 10 ** 5, 10 ** 6])
+    if "inventory" in suites:
+        bench_inventory(args.sizes or [10 ** 3, 10 ** 4, 10 ** 6])
+    if "parse" in suites:
+        bench_parse(args.sizes or [10 ** 5, 10 ** 6])
@@ -1,6 +1,190 @@
 #!/usr/bin/env python3
 
+import math
 import sys
+from bisect import bisect_left
+from itertools import accumulate, islice, repeat
+from operator import mul, sub
+from typing import Iterable, Iterator, TextIO
+
+USAGE = "Usage: python3 ft_score_analytics.py <score1> <score2> ... " \
+    "| --file <path> | -"
+QUANTILES = (0.5, 0.9, 0.99)
+CHUNK = 1 << 16
+READ_HINT = 1 << 20
+
+
+class TDigest:
+    '''Approximate quantiles in O(compression) memory (merging t-digest).
+
+    Each batch is sorted, merged with the centroids and re-cut at fixed
+    quantile boundaries that are denser towards both tails, so the work
+    per score happens in sorted() and accumulate(), not in Python.
+    '''
+
+    def __init__(self, compression: int = 200) -> None:
+        self.means: list[float] = []
+        self.weights: list[int] = []
+        self.total = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.cuts = [(1 - math.cos(math.pi * j / compression)) / 2
+                     for j in range(1, compression)]
+
+    def update(self, values: Iterable[float]) -> None:
+        points = sorted(values)
+        if not points:
+            return
+        self.min = min(self.min, points[0])
+        self.max = max(self.max, points[-1])
+        weights = [1] * len(points)
+        for mean, weight in zip(reversed(self.means),
+                                reversed(self.weights)):
+            i = bisect_left(points, mean)
+            points.insert(i, mean)
+            weights.insert(i, weight)
+
+        cum_weight = list(accumulate(weights, initial=0))
+        cum_sum = list(accumulate(map(mul, points, weights), initial=0))
+        self.total = cum_weight[-1]
+        self.means, self.weights = [], []
+        start = 0
+        for q in self.cuts + [1.0]:
+            end = bisect_left(cum_weight, q * self.total, start + 1)
+            end = min(end, len(points))
+            if end > start:
+                weight = cum_weight[end] - cum_weight[start]
+                self.means.append((cum_sum[end] - cum_sum[start]) / weight)
+                self.weights.append(weight)
+                start = end
+
+    def quantile(self, p: float) -> float:
+        '''Interpolates between centroid centres, and min/max at ends'''
+        if not self.total:
+            raise ValueError("No values added")
+        target = p * self.total
+        prev_rank, prev_mean = 0.0, self.min
+        rank = 0
+        for mean, weight in zip(self.means, self.weights):
+            centre = rank + weight / 2
+            if target < centre:
+                return prev_mean + (mean - prev_mean) * \
+                    (target - prev_rank) / (centre - prev_rank)
+            prev_rank, prev_mean = centre, mean
+            rank += weight
+        if self.total == prev_rank:
+            return self.max
+        return prev_mean + (self.max - prev_mean) * \
+            (target - prev_rank) / (self.total - prev_rank)
+
+
+class ScoreStats:
+    '''Single-pass count, sum, min, max, mean, variance and quantiles.
+
+    Scores are consumed in batches and merged (Welford/Chan), so only
+    one batch is ever held in memory.
+    '''
+
+    def __init__(self, quantiles: Iterable[float] = QUANTILES) -> None:
+        self.count = 0
+        self.total = 0
+        self.min: int | None = None
+        self.max: int | None = None
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.quantiles = tuple(quantiles)
+        self.digest = TDigest() if self.quantiles else None
+
+    def update(self, scores: list[int]) -> None:
+        if not scores:
+            return
+        count, total = len(scores), sum(scores)
+        mean = total / count
+        m2 = sum(map(pow, map(sub, scores, repeat(mean)), repeat(2)))
+        delta = mean - self.mean
+        merged = self.count + count
+        self.mean += delta * count / merged
+        self._m2 += m2 + delta * delta * self.count * count / merged
+        self.count = merged
+        self.total += total
+        low, high = min(scores), max(scores)
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        if self.digest is not None:
+            self.digest.update(scores)
+
+    def extend(self, scores: Iterable[int]) -> None:
+        iterator = iter(scores)
+        while chunk := list(islice(iterator, CHUNK)):
+            self.update(chunk)
+
+    @property
+    def variance(self) -> float:
+        '''Population variance, 0.0 until there are scores'''
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def range(self) -> int:
+        if self.min is None or self.max is None:
+            return 0
+        return self.max - self.min
+
+    def quantile(self, p: float) -> float:
+        if self.digest is None:
+            raise ValueError("Quantiles are disabled")
+        return self.digest.quantile(p)
+
+
+def parse_scores(tokens: Iterable[str],
+                 invalid: list[str] | None = None) -> Iterator[int]:
+    '''Yield the integer tokens; the others are appended to invalid'''
+    for token in tokens:
+        try:
+            yield int(token)
+        except ValueError:
+            if invalid is not None:
+                invalid.append(token)
+
+
+def read_score_chunks(stream: TextIO,
+                      invalid: list[str]) -> Iterator[list[int]]:
+    '''Scores from a text stream, about READ_HINT bytes per list'''
+    while lines := stream.readlines(READ_HINT):
+        tokens = " ".join(lines).split()
+        try:
+            yield list(map(int, tokens))
+        except ValueError:
+            yield list(parse_scores(tokens, invalid))
+
+
+def print_stream_report(stats: ScoreStats, invalid: list[str]) -> None:
+    if invalid:
+        print(f"Invalid parameters: {len(invalid)} "
+              f"(first: '{invalid[0]}')")
+    if stats.count == 0:
+        print("No scores provided.", end=" ")
+        print(USAGE)
+        return
+    print("Total players:", stats.count)
+    print("Total score:", stats.total)
+    print("Average score:", stats.total / stats.count)
+    print("High score:", stats.max)
+    print("Low score:", stats.min)
+    print("Score range:", stats.range)
+    print("Score variance:", stats.variance)
+    print("Score std dev:", stats.variance ** 0.5)
+    for p in stats.quantiles:
+        print(f"Score p{p * 100:g} (approx.):", round(stats.quantile(p), 2))
+
+
+def analyse_stream(stream: TextIO) -> None:
+    '''Stats for a stream of any length, without storing the scores'''
+    stats = ScoreStats()
+    invalid: list[str] = []
+    for chunk in read_score_chunks(stream, invalid):
+        stats.update(chunk)
+    print_stream_report(stats, invalid)
+
 
 if __name__ == "__main__":
     scores = sys.argv[1:]
@@ -8,7 +192,15 @@ if __name__ == "__main__":
 
     print("=== Player Score Analytics ===")
 
-    if len(scores) == 0:
+    if scores == ["-"]:
+        analyse_stream(sys.stdin)
+    elif len(scores) == 2 and scores[0] == "--file":
+        try:
+            with open(scores[1]) as file:
+                analyse_stream(file)
+        except OSError as error:
+            print(f"Cannot read '{scores[1]}': {error}")
+    elif len(scores) == 0:
         print("No scores provided.", end=" ")
         print("Usage: python3 ft_score_analytics.py <score1> <score2> ...")
     else:
@@ -25,11 +217,12 @@ if __name__ == "__main__":
             print("No scores provided.", end=" ")
             print("Usage: python3 ft_score_analytics.py <score1> <score2> ...")
         else:
-            total = sum(valid_scores)
+            stats = ScoreStats(quantiles=())
+            stats.update(valid_scores)
             print("Scores processed:", valid_scores)
-            print("Total players:", len(valid_scores))
-            print("Total score:", total)
-            print("Average score:", total / len(valid_scores))
-            print("High score:", max(valid_scores))
-            print("Low score:", min(valid_scores))
-            print("Score range:", max(valid_scores) - min(valid_scores))
+            print("Total players:", stats.count)
+            print("Total score:", stats.total)
+            print("Average score:", stats.total / stats.count)
+            print("High score:", stats.max)
+            print("Low score:", stats.min)
+            print("Score range:", stats.range)
@@ -1,6 +1,18 @@
 #!/usr/bin/env python3
 
+import heapq
 import math
+from array import array
+from collections import defaultdict
+from itertools import chain, product, repeat
+from typing import Any, Iterable, Iterator
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+BLOCK_ROWS = 256  # Rows per broadcast block in numpy pairwise distances
 
 
 def get_player_pos() -> tuple:
@@ -31,6 +43,184 @@ def calc_distance(dest: tuple, origin: tuple) -> float:
     return dist
 
 
+def to_points(coords: Any) -> Any:
+    '''N×3 coordinates as an (N, 3) ndarray or a flat array('d').
+
+    Accepts ndarrays, flat array('d') buffers (x0, y0, z0, x1, ...) and
+    iterables of (x, y, z) tuples.
+    '''
+    if np is not None and isinstance(coords, np.ndarray):
+        if coords.size % 3:
+            raise ValueError(f"Expected N×3 coordinates, got {coords.shape}")
+        return np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    if isinstance(coords, array) and coords.typecode == "d":
+        points = coords
+    else:
+        points = array("d", chain.from_iterable(coords))
+    if len(points) % 3:
+        raise ValueError(f"Expected N×3 coordinates, got {len(points)} "
+                         "values")
+    return points
+
+
+def as_tuples(points: Any) -> list[tuple]:
+    if np is not None and isinstance(points, np.ndarray):
+        return list(map(tuple, points.tolist()))
+    return list(zip(points[0::3], points[1::3], points[2::3]))
+
+
+def batch_distance(coords: Any, origin: tuple = (0, 0, 0)) -> Any:
+    '''Distance from every point to origin, in one vectorized pass'''
+    points = to_points(coords)
+    if np is not None and isinstance(points, np.ndarray):
+        return np.sqrt(((points - np.asarray(origin)) ** 2).sum(axis=1))
+    return array("d", map(math.dist, as_tuples(points), repeat(origin)))
+
+
+def _numpy_rows(points: Any) -> Iterator[tuple[int, Any]]:
+    '''(start, block of distance rows), BLOCK_ROWS rows at a time'''
+    for start in range(0, len(points), BLOCK_ROWS):
+        block = points[start:start + BLOCK_ROWS, None, :] - points
+        yield start, np.sqrt((block ** 2).sum(axis=2))
+
+
+def pairwise_distances(coords: Any) -> Any:
+    '''N×N distance matrix: an ndarray, or a list of array('d') rows'''
+    points = to_points(coords)
+    if np is not None and isinstance(points, np.ndarray):
+        matrix = np.empty((len(points), len(points)))
+        for start, rows in _numpy_rows(points):
+            matrix[start:start + len(rows)] = rows
+        return matrix
+    rows = as_tuples(points)
+    return [array("d", map(math.dist, rows, repeat(row))) for row in rows]
+
+
+def nearest_neighbours(coords: Any) -> tuple[list[int], list[float]]:
+    '''Index of and distance to each point's nearest other point.
+
+    Brute force in O(N²) vectorized work and O(N) memory; use GridIndex
+    when points are sparse relative to the query radius.
+    '''
+    points = to_points(coords)
+    indexes: list[int] = []
+    distances: list[float] = []
+    if np is not None and isinstance(points, np.ndarray):
+        for start, rows in _numpy_rows(points):
+            rows[np.arange(len(rows)), np.arange(start, start + len(rows))] \
+                = np.inf
+            nearest = rows.argmin(axis=1)
+            indexes.extend(nearest.tolist())
+            distances.extend(rows[np.arange(len(rows)), nearest].tolist())
+        return indexes, distances
+    tuples = as_tuples(points)
+    for i, point in enumerate(tuples):
+        row = array("d", map(math.dist, tuples, repeat(point)))
+        row[i] = math.inf
+        distance = min(row, default=math.inf)
+        indexes.append(row.index(distance) if len(row) > 1 else -1)
+        distances.append(distance)
+    return indexes, distances
+
+
+class GridIndex:
+    '''Uniform grid over points for radius and k-nearest queries.
+
+    Building is O(N); a query only visits the cells around its centre.
+    cell_size is best set close to the usual query radius.
+    '''
+
+    def __init__(self, coords: Any, cell_size: float) -> None:
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.points = as_tuples(to_points(coords))
+        self.cells: dict[tuple, list[int]] = defaultdict(list)
+        for index, point in enumerate(self.points):
+            self.cells[self._key(point)].append(index)
+        keys = list(self.cells) or [(0, 0, 0)]
+        self._low = tuple(map(min, zip(*keys)))
+        self._high = tuple(map(max, zip(*keys)))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _key(self, point: Iterable[float]) -> tuple:
+        return tuple(math.floor(c / self.cell_size) for c in point)
+
+    def _candidates(self, keys: Iterable[tuple]) -> list[int]:
+        cells = self.cells
+        return list(chain.from_iterable(cells[key] for key in keys
+                                        if key in cells))
+
+    def within(self, center: tuple, radius: float) -> list[int]:
+        '''Indexes of the points at most radius away from center'''
+        low = self._key(c - radius for c in center)
+        high = self._key(c + radius for c in center)
+        candidates = self._candidates(product(
+            *(range(lo, hi + 1) for lo, hi in zip(low, high))))
+        points = self.points
+        return [i for i in candidates
+                if math.dist(points[i], center) <= radius]
+
+    def pairs_within(self, radius: float) -> list[tuple[int, int]]:
+        '''Every (i, j), i < j, of points at most radius apart'''
+        reach = math.ceil(radius / self.cell_size)
+        offsets = [offset for offset in product(range(-reach, reach + 1),
+                                                repeat=3)
+                   if offset > (0, 0, 0)]
+        points, cells = self.points, self.cells
+        pairs: list[tuple[int, int]] = []
+        for (x, y, z), members in cells.items():
+            for n, i in enumerate(members):
+                for j in members[n + 1:]:
+                    if math.dist(points[i], points[j]) <= radius:
+                        pairs.append((min(i, j), max(i, j)))
+            neighbours = self._candidates((x + dx, y + dy, z + dz)
+                                          for dx, dy, dz in offsets)
+            for i in members:
+                point = points[i]
+                pairs.extend((min(i, j), max(i, j)) for j in neighbours
+                             if math.dist(point, points[j]) <= radius)
+        return pairs
+
+    def _shell(self, key: tuple, ring: int) -> Iterator[tuple]:
+        '''Cell keys at Chebyshev distance exactly ring from key'''
+        x, y, z = key
+        span = range(-ring, ring + 1)
+        for dx, dy in product(span, span):
+            if abs(dx) == ring or abs(dy) == ring:
+                dzs: Iterable[int] = span
+            else:
+                dzs = (-ring, ring) if ring else (0,)
+            for dz in dzs:
+                yield (x + dx, y + dy, z + dz)
+
+    def nearest(self, center: tuple, k: int = 1,
+                exclude: int | None = None) -> list[tuple[float, int]]:
+        '''Up to k (distance, index) pairs closest to center, nearest
+        first. exclude skips one index, e.g. the query point itself.
+        '''
+        key = self._key(center)
+        last_ring = max(max(abs(c - lo), abs(hi - c)) for c, lo, hi
+                        in zip(key, self._low, self._high))
+        best: list[tuple[float, int]] = []  # max-heap via negation
+        points = self.points
+        for ring in range(last_ring + 1):
+            for i in self._candidates(self._shell(key, ring)):
+                if i == exclude:
+                    continue
+                item = (-math.dist(points[i], center), i)
+                if len(best) < k:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+            # Cells beyond this ring are at least ring cells away
+            if len(best) == k and -best[0][0] <= ring * self.cell_size:
+                break
+        return sorted((-distance, i) for distance, i in best)
+
+
 if __name__ == "__main__":
     print("=== Game Coordinate System ===")
 
@@ -1,6 +1,15 @@
 #!/usr/bin/env python3
 
 import random
+from functools import reduce
+from itertools import accumulate, repeat
+from operator import and_, or_
+from typing import Any, Iterable, Sequence
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
 
 
 achievements = [
@@ -27,6 +36,108 @@ def gen_player_achievement() -> set:
     return set(achievement)
 
 
+class AchievementRegistry:
+    '''Maps achievement names to bit indexes.
+
+    A player's achievements are then one int bitmask, so set algebra
+    over players becomes |, & and ~ on ints (or on a uint64 ndarray
+    when numpy is installed and there are at most 64 achievements).
+    '''
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.bits: dict[str, int] = {}
+        self.names: list[str] = []
+        for name in names:
+            self.register(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def register(self, name: str) -> int:
+        '''Bit index of name, added at the end if it is new'''
+        if name not in self.bits:
+            self.bits[name] = len(self.names)
+            self.names.append(name)
+        return self.bits[name]
+
+    @property
+    def universe(self) -> int:
+        return (1 << len(self.names)) - 1
+
+    def mask(self, names: Iterable[str]) -> int:
+        try:
+            return reduce(or_, (1 << self.bits[name] for name in names), 0)
+        except KeyError as error:
+            raise ValueError(f"Unknown achievement: {error}") from None
+
+    def decode(self, mask: int) -> set[str]:
+        return {name for bit, name in enumerate(self.names)
+                if mask >> bit & 1}
+
+    def random_mask(self, low: int = 6) -> int:
+        '''Like gen_player_achievement(), as a bitmask'''
+        count = random.randint(low, len(self.names))
+        return reduce(or_, (1 << bit for bit in
+                            random.sample(range(len(self.names)), count)), 0)
+
+    def to_array(self, masks: Iterable[int]) -> Any:
+        '''Masks as a uint64 ndarray (numpy and <= 64 achievements)'''
+        if np is None:
+            raise Exception("numpy is not installed")
+        if len(self.names) > 64:
+            raise ValueError("More than 64 achievements, keep int masks")
+        return np.fromiter(masks, dtype=np.uint64)
+
+
+def _is_array(masks: Any) -> bool:
+    return np is not None and isinstance(masks, np.ndarray)
+
+
+def union_all(masks: Sequence[int]) -> int:
+    '''Achievements at least one player has'''
+    if _is_array(masks):
+        return int(np.bitwise_or.reduce(masks)) if len(masks) else 0
+    return reduce(or_, masks, 0)
+
+
+def common_all(masks: Sequence[int]) -> int:
+    '''Achievements every player has (0 for no players)'''
+    if not len(masks):
+        return 0
+    if _is_array(masks):
+        return int(np.bitwise_and.reduce(masks))
+    return reduce(and_, masks)
+
+
+def only_masks(masks: Sequence[int]) -> Any:
+    '''For each player, what none of the others have.
+
+    Prefix and suffix ORs make this O(N) instead of one union of the
+    others per player.
+    '''
+    if _is_array(masks):
+        before = np.zeros_like(masks)
+        after = np.zeros_like(masks)
+        if len(masks):
+            before[1:] = np.bitwise_or.accumulate(masks)[:-1]
+            after[:-1] = np.bitwise_or.accumulate(masks[::-1])[::-1][1:]
+        return masks & ~(before | after)
+    before = list(accumulate(masks, or_, initial=0))
+    after = list(accumulate(reversed(masks), or_, initial=0))[::-1]
+    return [mask & ~(prior | later) for mask, prior, later
+            in zip(masks, before, after[1:])]
+
+
+def missing_masks(masks: Sequence[int], universe: int | None = None) -> Any:
+    '''For each player, what is in universe (default: the union) but
+    not in their mask'''
+    if universe is None:
+        universe = union_all(masks)
+    if _is_array(masks):
+        return np.uint64(universe) & ~masks
+    return list(map(and_, repeat(universe), map(int.__invert__, masks)))
+
+
 if __name__ == "__main__":
     print("=== Achievement Tracker System ===\n")
 
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 
+import heapq
 import sys
-from typing import List, Dict
+from itertools import repeat
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+READ_HINT = 1 << 16  # Bytes of lines per bulk parse block
 
 
 def parse_args(args: List[str]) -> Dict[str, int]:
@@ -31,18 +35,244 @@ def parse_args(args: List[str]) -> Dict[str, int]:
     return inventory
 
 
-def statistics_inventory(inventory: Dict[str, int]) -> None:
-    total = sum(inventory.values())
+class ParseReport:
+    '''Outcome of a bulk parse: exact error counts per kind and the
+    first max_samples bad records as (line, kind, record).
+    '''
+
+    KINDS = ("invalid", "quantity", "duplicate")
+
+    def __init__(self, max_samples: int = 10) -> None:
+        self.records = 0
+        self.lines = 0
+        self.counts: Dict[str, int] = dict.fromkeys(self.KINDS, 0)
+        self.samples: List[Tuple[int, str, str]] = []
+        self.max_samples = max_samples
+
+    def add(self, line: int, kind: str, record: str) -> None:
+        self.counts[kind] += 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append((line, kind, record))
+
+    @property
+    def errors(self) -> int:
+        return sum(self.counts.values())
+
+    def summary(self) -> List[str]:
+        lines = [f"Parsed {self.records} records from {self.lines} lines, "
+                 f"{self.errors} errors"]
+        lines += [f"  {kind}: {count}"
+                  for kind, count in self.counts.items() if count]
+        lines += [f"  line {line}: {kind} '{record}'"
+                  for line, kind, record in self.samples]
+        return lines
+
+
+def _parse_records(lines: List[str], first_line: int,
+                   inventory: Dict[str, int], report: ParseReport) -> None:
+    '''parse_args() for one block of lines, errors go to report'''
+    records = 0
+    for number, line in enumerate(lines, first_line + 1):
+        if ":" not in line:
+            if not line.isspace():
+                report.add(number, "invalid", line.rstrip("\r\n"))
+            continue
+        name, s_qty = line.split(":", 1)
+        try:
+            qty = int(s_qty)  # int() also strips the line ending
+        except ValueError:
+            report.add(number, "quantity", line.rstrip("\r\n"))
+            continue
+        if name in inventory:
+            report.add(number, "duplicate", line.rstrip("\r\n"))
+        else:
+            inventory[name] = qty
+            records += 1
+    report.lines += len(lines)
+    report.records += records
+
+
+def _parse_block(lines: List[str], first_line: int,
+                 inventory: Dict[str, int], report: ParseReport) -> None:
+    '''One block of lines, split and converted in one go.
+
+    Only a block with exactly one ':' per line, int quantities and new,
+    distinct names is taken this way; anything else goes through
+    _parse_records() so every error gets its line number.
+    '''
+    count = len(lines)
+    text = "".join(lines)
+    if text.count(":") == count \
+            and all(map(str.__contains__, lines, repeat(":"))):
+        fields = text.replace("\n", ":").split(":")
+        try:
+            block = dict(zip(fields[0:2 * count:2],
+                             map(int, fields[1:2 * count:2])))
+        except ValueError:
+            block = {}
+        if len(block) == count and inventory.keys().isdisjoint(block):
+            inventory.update(block)
+            report.lines += count
+            report.records += count
+            return
+    _parse_records(lines, first_line, inventory, report)
+
+
+def parse_stream(stream: TextIO,
+                 report: Optional[ParseReport] = None,
+                 hint: int = READ_HINT) -> Tuple[Dict[str, int],
+                                                 ParseReport]:
+    '''Bulk parse_args() for one 'name:qty' record per line.
+
+    Reads about hint bytes of lines at a time; blank lines are skipped
+    and the first record of a name wins. Nothing is printed per error.
+    '''
+    inventory: Dict[str, int] = {}
+    report = report or ParseReport()
+    while lines := stream.readlines(hint):
+        _parse_block(lines, report.lines, inventory, report)
+    return inventory, report
+
+
+class Inventory:
+    '''Item quantities with the total, min and max kept up to date.
+
+    Min and max come from two heaps with lazy deletion: an update only
+    pushes a new entry and stale ones are dropped when they surface.
+    Ties go to the item inserted first, as with a dict scan. Building
+    from a dict heapifies once, in O(n).
+    '''
+
+    def __init__(self, items: Optional[Dict[str, int]] = None) -> None:
+        items = items or {}
+        # name: (qty, seq)
+        self._items: Dict[str, Tuple[int, int]] = {
+            name: (qty, seq) for seq, (name, qty) in enumerate(items.items())}
+        self._min_heap: List[Tuple[int, int, str]] = []
+        self._max_heap: List[Tuple[int, int, str]] = []
+        self._seq = len(self._items)
+        self.total = sum(items.values())
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._items
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __getitem__(self, name: str) -> int:
+        return self._items[name][0]
+
+    def __setitem__(self, name: str, qty: int) -> None:
+        '''Insert or update an item in O(log n)'''
+        items = self._items
+        current = items.get(name)
+        if current is None:
+            seq = self._seq
+            self._seq += 1
+            self.total += qty
+        elif current[0] == qty:
+            return
+        else:
+            seq = current[1]
+            self.total += qty - current[0]
+        items[name] = (qty, seq)
+        heapq.heappush(self._min_heap, (qty, seq, name))
+        heapq.heappush(self._max_heap, (-qty, seq, name))
+        if len(self._min_heap) > 2 * len(items) + 16:
+            self._rebuild()
+
+    def __delitem__(self, name: str) -> None:
+        '''Remove an item in O(1); its heap entries go stale'''
+        qty, _ = self._items.pop(name)
+        self.total -= qty
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        return ((name, qty) for name, (qty, _) in self._items.items())
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.items())
+
+    def _rebuild(self) -> None:
+        '''Drop stale heap entries once they outnumber the live ones'''
+        self._min_heap = [(qty, seq, name)
+                          for name, (qty, seq) in self._items.items()]
+        self._max_heap = [(-qty, seq, name) for qty, seq, name
+                          in self._min_heap]
+        heapq.heapify(self._min_heap)
+        heapq.heapify(self._max_heap)
+
+    def _live(self, entry: Tuple[int, int, str], sign: int) -> bool:
+        qty, seq, name = entry
+        return self._items.get(name) == (sign * qty, seq)
+
+    def _peek(self, heap: List[Tuple[int, int, str]],
+              sign: int) -> Optional[Tuple[str, int]]:
+        while heap and not self._live(heap[0], sign):
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        qty, _, name = heap[0]
+        return name, sign * qty
+
+    def min_item(self) -> Optional[Tuple[str, int]]:
+        return self._peek(self._min_heap, 1)
+
+    def max_item(self) -> Optional[Tuple[str, int]]:
+        return self._peek(self._max_heap, -1)
+
+    def _top(self, heap: List[Tuple[int, int, str]], sign: int,
+             k: int) -> List[Tuple[str, int]]:
+        found: List[Tuple[int, int, str]] = []
+        while heap and len(found) < k:
+            entry = heapq.heappop(heap)
+            # A qty set back to an older value leaves a duplicate entry
+            if self._live(entry, sign) and (not found
+                                            or entry != found[-1]):
+                found.append(entry)
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [(name, sign * qty) for qty, _, name in found]
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        '''The k most abundant items in O(k log n)'''
+        return self._top(self._max_heap, -1, k)
+
+    def bottom(self, k: int) -> List[Tuple[str, int]]:
+        '''The k least abundant items in O(k log n)'''
+        return self._top(self._min_heap, 1, k)
+
+    def percentage(self, name: str) -> float:
+        '''Share of the total quantity held by name, in O(1)'''
+        return (self[name] / self.total) * 100
+
+
+def statistics_inventory(inventory: Union[Dict[str, int],
+                                          Inventory]) -> None:
+    if isinstance(inventory, Inventory):
+        total = inventory.total
+    else:
+        total = sum(inventory.values())
 
     for item, qty in inventory.items():
         percentage = (qty / total) * 100
         print(f"Item '{item}' represents {percentage:.1f}%")
 
 
-def get_max_value(inventory: Dict[str, int]) -> None:
+def get_max_value(inventory: Union[Dict[str, int], Inventory]) -> None:
     max_value = ""
     max_qty = 0
 
+    if isinstance(inventory, Inventory):
+        top = inventory.max_item()
+        if top is not None and top[1] > max_qty:
+            max_value, max_qty = top
+        print(f"Item most abundant: {max_value} with quantity {max_qty}")
+        return
+
     for value, qty in inventory.items():
         if qty > max_qty:
             max_qty = qty
@@ -51,10 +281,17 @@ def get_max_value(inventory: Dict[str, int]) -> None:
     print(f"Item most abundant: {max_value} with quantity {max_qty}")
 
 
-def get_min_value(inventory: Dict[str, int]) -> None:
+def get_min_value(inventory: Union[Dict[str, int], Inventory]) -> None:
     min_value = None
     min_qty = None
 
+    if isinstance(inventory, Inventory):
+        bottom = inventory.min_item()
+        if bottom is not None:
+            min_value, min_qty = bottom
+        print(f"Item least abundant: {min_value} with quantity {min_qty}")
+        return
+
     for value, qty in inventory.items():
         if min_qty is None or qty < min_qty:
             min_value = value
@@ -67,6 +304,25 @@ if __name__ == "__main__":
 
     print("=== Inventory System Analysis ===")
 
+    if sys.argv[1:] == ["-"] or (len(sys.argv) == 3
+                                 and sys.argv[1] == "--file"):
+        try:
+            if sys.argv[1] == "-":
+                items, report = parse_stream(sys.stdin)
+            else:
+                with open(sys.argv[2]) as file:
+                    items, report = parse_stream(file)
+        except OSError as error:
+            print(f"Cannot read '{sys.argv[2]}': {error}")
+            sys.exit(1)
+        print("\n".join(report.summary()))
+        inventory = Inventory(items)
+        print(f"Total quantity of the {len(inventory)} items: ",
+              f"{inventory.total}")
+        get_max_value(inventory)
+        get_min_value(inventory)
+        sys.exit(1 if report.errors else 0)
+
     # Controlling void arguments
     if not sys.argv[1:]:
         print("No arguments provided!")
@@ -74,15 +330,15 @@ if __name__ == "__main__":
         sys.exit(1)
 
     inventory = parse_args(sys.argv[1:])
+    stock = Inventory(inventory)
 
     print("Got inventory:", inventory)
     print("Item list:", list(inventory.keys()))
-    print(f"Total quantity of the {len(inventory)} items: ",
-          f"{sum(inventory.values())}")
+    print(f"Total quantity of the {len(stock)} items: ", f"{stock.total}")
 
-    statistics_inventory(inventory)
-    get_max_value(inventory)
-    get_min_value(inventory)
+    statistics_inventory(stock)
+    get_max_value(stock)
+    get_min_value(stock)
 
     inventory.update({"magic_item": 1})
     print("Updated inventory:", inventory)
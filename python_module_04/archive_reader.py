@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Cyber Archives shared reader.
+
+Copies an archive to stdout's binary buffer without decoding it to str,
+either in fixed-size chunks or through a memory map, and reports the
+throughput.
+"""
+
+import mmap
+import os
+import sys
+import time
+from typing import BinaryIO
+
+MODES = ("chunked", "mmap")
+CHUNK_SIZE = 1 << 20
+
+
+def copy_archive(file: BinaryIO, out: BinaryIO | None = None,
+                 mode: str = "chunked",
+                 chunk_size: int = CHUNK_SIZE) -> tuple[int, float]:
+    """Copy an open binary file to out (stdout by default).
+
+    Returns (bytes copied, seconds). Memory use is one chunk in
+    "chunked" mode and only the page cache in "mmap" mode.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown read mode '{mode}'")
+    if out is None:
+        sys.stdout.flush()
+        out = sys.stdout.buffer
+
+    start = time.perf_counter()
+    copied = 0
+    size = os.fstat(file.fileno()).st_size
+    if mode == "mmap" and size > 0:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            view = memoryview(data)
+            try:
+                for offset in range(0, len(data), chunk_size):
+                    copied += out.write(view[offset:offset + chunk_size])
+            finally:
+                view.release()
+    else:
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while (count := file.readinto(buffer)):
+            copied += out.write(view[:count])
+    out.flush()
+    return copied, time.perf_counter() - start
+
+
+def format_rate(copied: int, seconds: float) -> str:
+    rate = copied / seconds if seconds else 0.0
+    return (f"{copied} bytes in {seconds:.4f}s "
+            f"({rate / (1 << 20):.2f} MiB/s)")
+
+
+def report_rate(copied: int, seconds: float) -> None:
+    """Throughput goes to stderr so the recovered data stays clean."""
+    sys.stderr.write(f"[STATS] {format_rate(copied, seconds)}\n")
+
+
+def stream_archive(file_name: str, mode: str = "chunked",
+                   chunk_size: int = CHUNK_SIZE) -> tuple[int, float]:
+    """Open file_name and copy it to stdout, reporting bytes/s."""
+    with open(file_name, "rb") as file:
+        copied, seconds = copy_archive(file, mode=mode,
+                                       chunk_size=chunk_size)
+    report_rate(copied, seconds)
+    return copied, seconds
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3) or (len(sys.argv) == 3
+                                       and sys.argv[2] not in MODES):
+        print(f"Usage: {sys.argv[0]} <file> [{'|'.join(MODES)}]")
+        sys.exit(1)
+    try:
+        stream_archive(sys.argv[1], *sys.argv[2:])
+    except OSError as error:
+        sys.stderr.write(f"[STDERR] Error reading '{sys.argv[1]}': "
+                         f"{error}\n")
+        sys.exit(1)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Cyber Archives batch processor.
+
+Reads and transforms many archives at once: a bounded thread pool does
+the file I/O and a process pool the per-line transform. Results come
+back in input order and every file succeeds or fails on its own, with
+the same error messages as secure_archive(), which does the reads.
+"""
+
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE, "ex1"))
+sys.path.insert(0, os.path.join(BASE, "ex3"))
+from ft_archive_creation import mark_line  # noqa: E402
+from ft_vault_security import secure_archive  # noqa: E402
+
+Result = tuple[str, bool, str]
+
+
+def expand_paths(patterns: Iterable[str]) -> list[str]:
+    """Expand globs (sorted); plain paths are kept even if missing.
+
+    A file named twice (e.g. literally and by a glob) is listed once,
+    at its first position.
+    """
+    paths: list[str] = []
+    seen: set[str] = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) \
+            else [pattern]
+        for path in matches:
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+def transform_text(content: str,
+                   transform: Callable[[str], str] = mark_line) -> str:
+    return "".join(map(transform, content.splitlines(keepends=True)))
+
+
+def common_root(paths: list[str]) -> str:
+    """Deepest directory holding every path."""
+    if not paths:
+        return os.getcwd()
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path))
+                               for path in paths])
+
+
+def destination(path: str, out_dir: str, root: str) -> str:
+    """path's place under out_dir, mirroring its position below root.
+
+    Distinct files always get distinct destinations, so a/x.txt and
+    b/x.txt are not written over each other.
+    """
+    return os.path.join(out_dir,
+                        os.path.relpath(os.path.abspath(path), root))
+
+
+def _batches(paths: list[str], size: int) -> Iterator[list[str]]:
+    iterator = iter(paths)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def process_archives(paths: list[str],
+                     transform: Callable[[str], str] = mark_line,
+                     out_dir: str | None = None,
+                     io_workers: int = 8,
+                     cpu_workers: int | None = None,
+                     batch_size: int = 256) -> Iterator[Result]:
+    """Yield (path, success, message) for every path, in input order.
+
+    The transform runs in a process pool and must be a module-level
+    function; cpu_workers=0 runs it on the I/O threads instead, which
+    is cheaper for small fragments. At most batch_size files are held
+    in memory at a time. Saved files keep their directories below
+    common_root(paths) inside out_dir.
+    """
+    root = common_root(paths)
+    cpu_pool: Executor | None = None
+    if cpu_workers != 0:
+        cpu_pool = ProcessPoolExecutor(cpu_workers)
+    try:
+        with ThreadPoolExecutor(io_workers) as io_pool:
+            for batch in _batches(paths, batch_size):
+                yield from _process_batch(batch, transform, out_dir, root,
+                                          io_pool, cpu_pool)
+    finally:
+        if cpu_pool is not None:
+            cpu_pool.shutdown()
+
+
+def _transform(future: Future | None, read: tuple) -> tuple[bool, str]:
+    success, data = read
+    if future is None:
+        return (success, str(data))
+    try:
+        return (True, future.result())
+    except Exception as error:
+        return (False, f"Transform failed: {error}")
+
+
+def _save(path: str, result: tuple[bool, str], out_dir: str,
+          root: str) -> tuple[bool, str]:
+    success, data = result
+    if not success:
+        return result
+    target = destination(path, out_dir, root)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+    except OSError as error:
+        return (False, str(error))
+    success, message = secure_archive(target, "write", data)
+    return (success, str(message))
+
+
+def _process_batch(batch: list[str], transform: Callable[[str], str],
+                   out_dir: str | None, root: str, io_pool: Executor,
+                   cpu_pool: Executor | None) -> Iterator[Result]:
+    reads = list(io_pool.map(secure_archive, batch))
+    pool = cpu_pool or io_pool
+    futures = [pool.submit(transform_text, data, transform) if success
+               else None for success, data in reads]
+    results = list(map(_transform, futures, reads))
+    if out_dir is not None:
+        results = list(io_pool.map(_save, batch, results,
+                                   [out_dir] * len(batch),
+                                   [root] * len(batch)))
+    for path, (success, message) in zip(batch, results):
+        yield (path, success, message)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Read and transform many archives in parallel")
+    parser.add_argument("paths", nargs="+", help="files or glob patterns")
+    parser.add_argument("--out", metavar="DIR",
+                        help="save transformed archives in DIR")
+    parser.add_argument("--io-workers", type=int, default=8)
+    parser.add_argument("--cpu-workers", type=int, default=None,
+                        help="process pool size, 0 to transform in threads")
+    args = parser.parse_args()
+
+    print("=== Cyber Archives Batch Processing ===")
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    paths = expand_paths(args.paths)
+    root = common_root(paths)
+    failed = 0
+    for path, success, message in process_archives(
+            paths, out_dir=args.out, io_workers=args.io_workers,
+            cpu_workers=args.cpu_workers):
+        if success:
+            print(f"[OK] {path}" + (
+                f" -> {destination(path, args.out, root)}"
+                if args.out else ""))
+        else:
+            failed += 1
+            print(f"[ERROR] {path}: {message}")
+    print(f"\n{len(paths) - failed}/{len(paths)} archives processed")
+    sys.exit(1 if failed else 0)
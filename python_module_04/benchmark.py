@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Cyber Archives benchmarks.
+
+Generates synthetic archives in a temporary directory and times the
+archive tools on them. Sizes are given in MB on the command line.
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+BASE = Path(__file__).resolve().parent
+LINE = "[FRAGMENT 001] Digital preservation protocols established 2087\n"
+
+
+def load(relative: str) -> ModuleType:
+    """Import an exercise file by path (exN folders are not packages)."""
+    path = BASE / relative
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def report(label: str, size: int, seconds: float) -> None:
+    rate = size / seconds / (1 << 20) if seconds else float("inf")
+    print(f"  {label:<24} {seconds:>9.3f}s {rate:>10.1f} MiB/s")
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def make_archive(path: str, size: int) -> None:
+    block = LINE * (1 << 14)
+    with open(path, "w") as file:
+        written = 0
+        while written < size:
+            chunk = block[:size - written]
+            file.write(chunk)
+            written += len(chunk)
+
+
+def legacy_transform(file_name: str) -> str:
+    """transform_data() as it was: one growing string for the file."""
+    result = ""
+    with open(file_name, "r") as file:
+        for line in file:
+            result += line.rstrip("\n") + "#\n"
+    return result
+
+
+def bench_transform(sizes_mb: list[int]) -> None:
+    ex1 = load("ex1/ft_archive_creation.py")
+    legacy_limit = 100 << 20
+    memory_limit = 100 << 20
+
+    print("== transform_data (string concat vs streaming) ==")
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "archive.txt")
+        dest = os.path.join(tmp, "preserved.txt")
+        for size_mb in sizes_mb:
+            size = size_mb << 20
+            make_archive(source, size)
+            print(f"{size_mb} MB archive")
+
+            def legacy() -> None:
+                content = legacy_transform(source)
+                with open(dest, "w") as file:
+                    file.write(content)
+
+            def streaming() -> None:
+                with open(dest, "w", buffering=ex1.WRITE_BUFFER) as file:
+                    file.writelines(ex1.transform_data(source))
+
+            variants = [("streaming", streaming)]
+            if size > legacy_limit:
+                print(f"  {'concat + write':<24} skipped"
+                      " (holds the whole file in memory)")
+            else:
+                variants.insert(0, ("concat + write", legacy))
+            for label, func in variants:
+                report(label, size, timed(func))
+                if size <= memory_limit:
+                    peak = peak_memory(func) / (1 << 20)
+                    print(f"  {label + ' peak':<24} {peak:>9.1f} MiB")
+
+
+if __name__ == "__main__":
+    print("=== Cyber Archives - Benchmark ===")
+    try:
+        sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100, 1000]
+    except ValueError as error:
+        print(f"Invalid size: {error}")
+        sys.exit(1)
+    bench_transform(sizes)
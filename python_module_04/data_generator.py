@@ -6,13 +6,36 @@ Generates structured test data for file operation exercises with comprehensive
 error handling, type safety, and extensible architecture.
 """
 
+import argparse
+import hashlib
 import json
+import os
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Callable, Any
+from typing import Dict, List, Optional, Union, Callable, Any, Tuple
 from datetime import datetime
 
+BLOCK_SIZE = 1 << 20  # Bytes per write in scaled mode
+MANIFEST_NAME = "manifest.json"  # Written next to sample_data.json
+SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte count such as '512', '64K', '100M' or '2G'."""
+    text = text.strip().upper().removesuffix("B")
+    unit = text[-1:] if text[-1:] in SIZE_UNITS else ""
+    try:
+        size = int(float(text[:len(text) - len(unit)]) * SIZE_UNITS[unit])
+    except (ValueError, OverflowError):
+        raise ValueError(f"Invalid size '{text}'") from None
+    if size <= 0:
+        raise ValueError(f"Size must be positive, got '{text}'")
+    return size
+
 
 def handle_file_errors(func: Callable) -> Callable:
     """Decorator for consistent file operation error handling."""
@@ -95,31 +118,174 @@ class DataTemplates:
 class ArchiveDataGenerator:
     """Main data generation class with comprehensive file operations."""
 
-    def __init__(self, base_path: Optional[str] = None) -> None:
-        """Initialize generator with optional base path."""
+    def __init__(self, base_path: Optional[str] = None,
+                 force: bool = False) -> None:
+        """Initialize generator with optional base path.
+
+        Unless force is set, files whose manifest entry still matches
+        are not rewritten.
+        """
         self.base_path = Path(base_path) if base_path else Path(".")
         self.templates = DataTemplates.get_templates()
         self.generated_files: List[str] = []
+        self.force = force
 
         # Ensure base directory exists
         try:
             self.base_path.mkdir(parents=True, exist_ok=True)
         except Exception as e:
             print(f"Warning: Could not create base directory: {e}")
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Read the manifest; a missing or corrupt one means rebuild."""
+        try:
+            with open(self.base_path / MANIFEST_NAME, 'r',
+                      encoding='utf-8') as file:
+                manifest = json.load(file)
+            return manifest if isinstance(manifest, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @handle_file_errors
+    def save_manifest(self) -> Optional[bool]:
+        """Atomically write the manifest of generated files."""
+        file_path = self.base_path / MANIFEST_NAME
+        fd, tmp_name = tempfile.mkstemp(dir=self.base_path,
+                                        prefix=f".{MANIFEST_NAME}.")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(self.manifest, file, indent=2, sort_keys=True)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, file_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        return True
+
+    def _unchanged(self, filename: str, key: str, digest: str) -> bool:
+        """True if the manifest has digest and the file is untouched.
+
+        Only the file's stat is checked, so skipping costs no reads.
+        """
+        entry = self.manifest.get(filename)
+        if self.force or not entry or entry.get(key) != digest:
+            return False
+        try:
+            stat = (self.base_path / filename).stat()
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == \
+            (entry.get("size"), entry.get("mtime_ns"))
+
+    def _record(self, filename: str, key: str, digest: str) -> None:
+        stat = (self.base_path / filename).stat()
+        self.manifest[filename] = {key: digest, "size": stat.st_size,
+                                   "mtime_ns": stat.st_mtime_ns}
 
     @validate_output
     @handle_file_errors
     def _write_file(self, filename: str, content: str) -> bool:
         """Write content to file with comprehensive error handling."""
         file_path = self.base_path / filename
+        digest = hashlib.blake2b(content.encode('utf-8')).hexdigest()
+        self.generated_files.append(filename)
+        if self._unchanged(filename, "blake2b", digest):
+            print(f"Unchanged: {filename}")
+            return True
 
         with open(file_path, 'w', encoding='utf-8') as file:
             file.write(content)
 
-        self.generated_files.append(filename)
+        self._record(filename, "blake2b", digest)
         print(f"Generated: {filename}")
         return True
 
+    @handle_file_errors
+    def _stream_file(self, filename: str, block: bytes,
+                     size: int) -> Optional[Tuple[int, float]]:
+        """Write size bytes of repeated block, then rename into place.
+
+        Bypasses validate_output's size limit; the temp file lives in
+        base_path so the final rename is atomic. Returns (bytes, s).
+        The manifest stores a BLAKE2 digest of (block, size) under
+        "source" rather than hashing gigabytes of output.
+        """
+        file_path = self.base_path / filename
+        source = hashlib.blake2b(block)
+        source.update(size.to_bytes(8, 'little'))
+        digest = source.hexdigest()
+        self.generated_files.append(filename)
+        if self._unchanged(filename, "source", digest):
+            print(f"Unchanged: {filename}")
+            return size, 0.0
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.base_path,
+                                        prefix=f".{filename}.")
+        start = time.perf_counter()
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                view = memoryview(block)
+                written = 0
+                while written < size:
+                    written += file.write(view[:size - written])
+            os.chmod(tmp_name, 0o644)  # mkstemp creates files as 0600
+            os.replace(tmp_name, file_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        seconds = time.perf_counter() - start
+
+        self._record(filename, "source", digest)
+        rate = written / seconds / (1 << 20) if seconds else 0.0
+        print(f"Generated: {filename} ({written / (1 << 20):.1f} MiB in "
+              f"{seconds:.2f}s, {rate:.1f} MiB/s)")
+        return written, seconds
+
+    def _template_block(self, name: str) -> bytes:
+        """About BLOCK_SIZE bytes of whole template lines."""
+        text = self._format_content(self.templates[name]) + "\n"
+        data = text.encode(self.templates[name].get("encoding", "utf-8"))
+        return data * max(1, BLOCK_SIZE // len(data))
+
+    def generate_scaled_files(self, size: int,
+                              names: Optional[List[str]] = None,
+                              workers: int = 4) -> Dict[str, bool]:
+        """Stream '<template>_large.txt' files of size bytes each.
+
+        Files are written concurrently by a pool of workers threads;
+        file writes release the GIL, so disk bandwidth is the limit.
+        """
+        names = names or list(self.templates)
+        unknown = [name for name in names if name not in self.templates]
+        if unknown:
+            raise ValueError(f"Unknown template(s): {', '.join(unknown)}")
+
+        print("=== CYBER ARCHIVES - DATA GENERATOR (scaled) ===")
+        print(f"Streaming {len(names)} file(s) of {size} bytes "
+              f"with {workers} worker(s)...")
+        print()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as pool:
+            futures = {
+                name: pool.submit(self._stream_file, f"{name}_large.txt",
+                                  self._template_block(name), size)
+                for name in names
+            }
+            results = {name: future.result() is not None
+                       for name, future in futures.items()}
+        self.save_manifest()
+        seconds = time.perf_counter() - start
+
+        successful = sum(results.values())
+        total = successful * size / (1 << 20)
+        print()
+        print(f"Generation complete: {successful}/{len(names)} files, "
+              f"{total:.1f} MiB in {seconds:.2f}s "
+              f"({total / seconds if seconds else 0.0:.1f} MiB/s)")
+        return results
+
     def _format_content(self, template_data: Dict[str, Any]) -> str:
         """Format template content into string representation."""
         content = template_data.get("content", "")
@@ -252,6 +418,7 @@ class ArchiveDataGenerator:
                 print(f"Failed to generate {description}: {e}")
                 results[generator_func.__name__] = False
 
+        self.save_manifest()
         print()
         print(f"Generation complete: {successful}/{len(generators)} "
               f"files created successfully")
@@ -278,21 +445,39 @@ class ArchiveDataGenerator:
                 if file_path.exists():
                     file_path.unlink()
                     deleted_count += 1
+                self.manifest.pop(filename, None)
             except Exception as e:
                 print(f"Could not delete {filename}: {e}")
 
         self.generated_files.clear()
+        self.save_manifest()
         return deleted_count
 
 
 def main() -> None:
     """Main entry point with command-line argument handling."""
-    try:
-        # Check for optional base path argument
-        base_path = sys.argv[1] if len(sys.argv) > 1 else None
+    parser = argparse.ArgumentParser(
+        description="Generate Cyber Archives training files")
+    parser.add_argument("base_path", nargs="?", default=None,
+                        help="output directory (default: current)")
+    parser.add_argument("--size", type=parse_size, metavar="SIZE",
+                        help="stream large archives of SIZE bytes each "
+                             "(e.g. 100M, 2G) instead of the samples")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="concurrent writers in --size mode")
+    parser.add_argument("--templates", nargs="+", metavar="NAME",
+                        help="templates to scale (default: all)")
+    parser.add_argument("--force", action="store_true",
+                        help="rewrite files even if the manifest matches")
+    args = parser.parse_args()
 
-        generator = ArchiveDataGenerator(base_path)
-        results = generator.generate_all_files()
+    try:
+        generator = ArchiveDataGenerator(args.base_path, args.force)
+        if args.size:
+            results = generator.generate_scaled_files(
+                args.size, args.templates, args.workers)
+        else:
+            results = generator.generate_all_files()
 
         # Exit with appropriate code based on results
         if all(results.values()):
@@ -1,17 +1,25 @@
 #!/usr/bin/env python3
+import os
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+from archive_reader import MODES, copy_archive, report_rate  # noqa: E402
+
 
 def recovery_files() -> None:
-    if len(sys.argv) > 1:
+    mode = sys.argv[2] if len(sys.argv) > 2 else "chunked"
+    if len(sys.argv) > 1 and mode in MODES:
         try:
             file_source = sys.argv[1]
             print(f"\nAccessing file '{file_source}'")
-            file = open(file_source, 'r')
+            file = open(file_source, 'rb')
             print("Accessing Storage Vault:", file_source)
             print("\nRECOVERED DATA:")
-            print(file.read())
+            stats = copy_archive(file, mode=mode)
+            print()
             file.close()
+            report_rate(*stats)
 
             print("\n[COMPLETED] Data recovery complete. "
                   "Storage unit disconected")
@@ -20,7 +28,7 @@ def recovery_files() -> None:
             print("[ERROR] Storage vault not found")
 
     else:
-        print("Usage: ft_ancient_text.py <file>")
+        print(f"Usage: ft_ancient_text.py <file> [{'|'.join(MODES)}]")
 
 
 if __name__ == "__main__":
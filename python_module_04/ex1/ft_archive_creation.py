@@ -1,28 +1,44 @@
 #!/usr/bin/env python3
 
+import os
 import sys
+from typing import Callable, Iterator
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+from archive_reader import MODES, copy_archive, report_rate  # noqa: E402
+
+
+WRITE_BUFFER = 1 << 20
+READ_HINT = 1 << 20
+
+
+def mark_line(line: str) -> str:
+    return line.rstrip("\n") + "#\n"
 
-def transform_data(file_name: str) -> str:
-    result = ""
-    file = None
 
-    file = open(file_name, "r")
-    for line in file:
-        result += line.rstrip("\n") + "#\n"
+def transform_data(file_name: str,
+                   transform: Callable[[str], str] = mark_line
+                   ) -> Iterator[str]:
+    """Yield the transformed file in blocks of about READ_HINT bytes.
 
-    file.close()
-    return result
+    Each block is whole transformed lines, so memory stays bounded by
+    the block size however large the archive is.
+    """
+    with open(file_name, "r") as file:
+        while lines := file.readlines(READ_HINT):
+            yield "".join(map(transform, lines))
 
 
-def read_archive(file_name: str) -> bool:
+def read_archive(file_name: str, mode: str = "chunked") -> bool:
     file = None
     success = True
 
     try:
-        file = open(file_name, "r")
-        content = file.read()
-        print(content)
+        file = open(file_name, "rb")
+        stats = copy_archive(file, mode=mode)
+        print()
+        report_rate(*stats)
 
     except OSError:
         print("ERROR: Unable to read archive")
@@ -39,27 +55,28 @@ def read_archive(file_name: str) -> bool:
 
 if __name__ == "__main__":
     print("=== Cyber Archives Recovery & Preservation ===")
-    if len(sys.argv) != 2:
-        print("Usage: python3 ft_archive_creation.py <filename.txt>")
+    if len(sys.argv) not in (2, 3) or (len(sys.argv) == 3
+                                       and sys.argv[2] not in MODES):
+        print("Usage: python3 ft_archive_creation.py <filename.txt>"
+              f" [{'|'.join(MODES)}]")
         sys.exit(1)
 
     file_name = sys.argv[1]
     print(f"Accessing file '{file_name}'")
     print("\n---\n")
-    if not read_archive(file_name):
+    if not read_archive(file_name, *sys.argv[2:]):
         sys.exit(1)
 
     print("\nTransform data:")
     print("---\n")
-    transformed_content = transform_data(file_name)
-    print(transformed_content, end="")
+    sys.stdout.writelines(transform_data(file_name))
     print("\n---")
 
     new_name = input("Enter new file name (or empty): ")
     if new_name:
         print(f"Saving data to '{new_name}'")
-        new_file = open(new_name, "w")
-        new_file.write(transformed_content)
+        new_file = open(new_name, "w", buffering=WRITE_BUFFER)
+        new_file.writelines(transform_data(file_name))
         new_file.close()
         print(f"Data saved in file '{new_name}'.")
     else:
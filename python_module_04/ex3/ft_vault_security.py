@@ -1,15 +1,65 @@
 #!/usr/bin/env python3
 
+import asyncio
+import os
+import tempfile
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Iterable
+
+CHUNK_SIZE = 1 << 16
+MAX_WORKERS = 8
+# Read once at import: os.umask() can only be queried by setting it,
+# which would race with the executor threads doing atomic writes.
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def atomic_write(file_name: str, content: str) -> None:
+    """Write to a temp file next to file_name, then rename it over.
+
+    Readers see either the old file or the complete new one. The new
+    file keeps the old one's permission bits, or gets the usual
+    0o666 & ~umask when it did not exist (mkstemp itself uses 0o600).
+    """
+    directory = os.path.dirname(os.path.abspath(file_name))
+    try:
+        mode = os.stat(file_name).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~UMASK
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        try:
+            os.fchmod(fd, mode)
+            file = os.fdopen(fd, "w")
+        except BaseException:
+            os.close(fd)
+            raise
+        with file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_name, file_name)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
 def secure_archive(file_name: str,
                    action: str = "read",
-                   content: str | None = None) -> tuple:
-    if action not in ("read" "write"):
+                   content: str | None = None,
+                   atomic: bool = False) -> tuple:
+    if action not in ("read", "write"):
         return (False, "Invalid action")
 
     if action == "write" and content is None:
         return (False, "No content to write")
 
     try:
+        if action == "write" and atomic:
+            atomic_write(file_name, content)
+            return (True, "Content successfully written to file.")
+
         mode = "r" if action == "read" else "w"
 
         with open(file_name, mode) as file:
@@ -32,6 +82,55 @@ def secure_archive(file_name: str,
         return (False, error)
 
 
+async def async_secure_archive(file_name: str,
+                               action: str = "read",
+                               content: str | None = None,
+                               executor: Executor | None = None) -> tuple:
+    """secure_archive() on an executor thread, with atomic writes.
+
+    The event loop never blocks on the file; results and error tuples
+    are the same as secure_archive().
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, partial(secure_archive, file_name, action, content,
+                          atomic=True))
+
+
+async def gather_archives(requests: Iterable[tuple],
+                          max_workers: int = MAX_WORKERS) -> list[tuple]:
+    """Run many (file_name[, action[, content]]) requests concurrently.
+
+    Blocking I/O is bounded by a private pool of max_workers threads;
+    results keep the order of requests.
+    """
+    executor = ThreadPoolExecutor(max_workers)
+    try:
+        return await asyncio.gather(*(
+            async_secure_archive(*request, executor=executor)
+            for request in requests))
+    finally:
+        # Waiting here would block the event loop on cancel or timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def async_read_chunks(file_name: str, chunk_size: int = CHUNK_SIZE,
+                            executor: Executor | None = None
+                            ) -> AsyncIterator[bytes]:
+    """Yield the file as bytes chunks, each read off the event loop.
+
+    Unlike secure_archive(), open errors are raised (OSError).
+    """
+    loop = asyncio.get_running_loop()
+    file = await loop.run_in_executor(executor, open, file_name, "rb")
+    try:
+        while chunk := await loop.run_in_executor(executor, file.read,
+                                                  chunk_size):
+            yield chunk
+    finally:
+        await loop.run_in_executor(executor, file.close)
+
+
 if __name__ == "__main__":
     print("=== Cyber Archives Security ===\n")
     print("Using 'secure_archive' to read from a nonexistent file:")
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+
+BASE = Path(__file__).resolve().parent
+
+
+def load(relative: str) -> ModuleType:
+    '''Import an exercise file by path (ex0/ex1/ex2 are not packages)'''
+    path = BASE / relative
+    name = path.stem
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def report(label: str, size: int, seconds: float) -> None:
+    rate = size / seconds if seconds else float("inf")
+    print(f"  {label:<24} {seconds:>9.4f}s {rate:>14,.0f} items/s")
+
+
+def bench_queue_backends(sizes: list[int]) -> None:
+    ex0 = load("ex0/data_processor.py")
+    list_limit = 10 ** 5
+
+    print("== DataProcessor queue backends (ingest + drain) ==")
+    for size in sizes:
+        print(f"{size:,} items")
+        data = ["x"] * size
+        for backend in ("list", "deque", "ring"):
+            if backend == "list" and size > list_limit:
+                print(f"  {backend + ' output()':<24} skipped"
+                      " (quadratic drain)")
+                continue
+
+            def one_by_one() -> None:
+                proc = ex0.TextProcessor(backend, capacity=size)
+                proc.ingest(data)
+                for _ in range(size):
+                    proc.output()
+
+            def batched() -> None:
+                proc = ex0.TextProcessor(backend, capacity=size)
+                proc.ingest(data)
+                while proc.output_many(4096):
+                    pass
+
+            report(f"{backend} output()", size, timed(one_by_one))
+            report(f"{backend} output_many()", size, timed(batched))
+
+
+def bench_numeric_storage(sizes: list[int]) -> None:
+    ex0 = load("ex0/data_processor.py")
+
+    print("== NumericProcessor storage (str list vs columnar) ==")
+    for size in sizes:
+        print(f"{size:,} values")
+        data = [i * 0.5 for i in range(size)]
+        for columnar in (False, True):
+            label = "columnar" if columnar else "str"
+            report(f"{label} ingest", size, timed(
+                lambda: ex0.NumericProcessor(columnar=columnar).ingest(data)))
+
+            tracemalloc.start()
+            proc = ex0.NumericProcessor(columnar=columnar)
+            proc.ingest(data)
+            used = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            per_million = used / size * 10 ** 6 / 2 ** 20
+            print(f"  {label + ' memory':<24} {per_million:>9.1f} MiB"
+                  " per million values")
+
+            def drain(proc: Any = proc) -> None:
+                proc.output_many(size)
+
+            report(f"{label} drain", size, timed(drain))
+            del proc
+
+
+def legacy_ingest(kind: str, data: list[Any], store: list[str]) -> None:
+    '''Per-element validate() then ingest() loop, as ex0 used to do'''
+    if kind == "numeric":
+        for value in data:
+            if not isinstance(value, (int, float)) or \
+                    isinstance(value, bool):
+                raise Exception("Improper numeric data")
+        for value in data:
+            store.append(str(value))
+    elif kind == "text":
+        for value in data:
+            if not isinstance(value, str):
+                raise Exception("Improper text data")
+        store.extend(data)
+    else:
+        for log in data:
+            if not all(isinstance(key, str) and isinstance(value, str)
+                       for key, value in log.items()):
+                raise Exception("Improper log data")
+        for log in data:
+            store.append(f"{log.get('log_level')}: "
+                         f"{log.get('log_message')}")
+
+
+def bench_batch_validation(sizes: list[int]) -> None:
+    ex0 = load("ex0/data_processor.py")
+    processors = {
+        "numeric": ex0.NumericProcessor,
+        "text": ex0.TextProcessor,
+        "log": ex0.LogProcessor,
+    }
+    samples = {
+        "numeric": lambda i: i * 0.5,
+        "text": lambda i: f"word{i}",
+        "log": lambda i: {"log_level": "INFO", "log_message": f"msg {i}"},
+    }
+
+    print("== Batch validation (per-element vs fused) ==")
+    for size in sizes:
+        rounds = max(1, 10 ** 6 // size)
+        print(f"{size:,} elements x {rounds:,} batches")
+        for kind, factory in processors.items():
+            batch = [samples[kind](i) for i in range(size)]
+
+            def per_element() -> None:
+                store: list[str] = []
+                for _ in range(rounds):
+                    legacy_ingest(kind, batch, store)
+
+            def fused() -> None:
+                proc = factory()
+                for _ in range(rounds):
+                    proc.ingest(batch)
+
+            report(f"{kind} per-element", size * rounds, timed(per_element))
+            report(f"{kind} fused", size * rounds, timed(fused))
+
+
+def bench_chunked_drain(size: int = 10 ** 6) -> None:
+    ex2 = load("ex2/data_pipeline.py")
+    copy_limit = 10 ** 9
+
+    print(f"== Chunked drain of {size:,} items (slicing vs cursor) ==")
+    for chunk in (1, 10, 1000):
+        print(f"chunks of {chunk:,}")
+
+        def sliced() -> None:
+            buffer = list(range(size))
+            while buffer:
+                buffer[:chunk]
+                buffer = buffer[chunk:]
+
+        def cursor() -> None:
+            buffer = ex2.CursorBuffer()
+            buffer.extend(range(size))
+            while buffer:
+                buffer.take(chunk)
+
+        if size * size // chunk // 2 > copy_limit:
+            print(f"  {'slicing':<24} skipped (quadratic copy)")
+        else:
+            report("slicing", size, timed(sliced))
+        report("cursor", size, timed(cursor))
+
+
+def bench_log_formatter(sizes: list[int]) -> None:
+    ex0 = load("ex0/data_processor.py")
+    levels = ("INFO", "WARNING", "ERROR", "NOTICE")
+
+    print("== Log formatting (f-string loop vs LogFormatter) ==")
+    for size in sizes:
+        print(f"{size:,} logs")
+        logs = [{"log_level": levels[i % 4], "log_message": f"event {i}"}
+                for i in range(size)]
+
+        def fstring_loop() -> None:
+            [f"{log.get('log_level')}: {log.get('log_message')}"
+             for log in logs]
+
+        report("f-string loop", size, timed(fstring_loop))
+        for layout in ex0.LogFormatter.layouts:
+            formatter = ex0.LogFormatter(layout)
+            report(f"{layout} format_batch", size,
+                   timed(lambda: formatter.format_batch(logs)))
+
+
+MIXES = {
+    "demo": {"numeric": 2, "text": 2, "log": 1},
+    "numeric_heavy": {"numeric": 8, "text": 1, "log": 1},
+    "log_heavy": {"numeric": 1, "text": 1, "log": 8},
+}
+LIST_LENGTHS = {"short": (1, 5), "long": (50, 200)}
+LEVELS = ("INFO", "WARNING", "ERROR", "NOTICE")
+
+
+def generate_stream(size: int, mix: dict[str, int],
+                    list_length: tuple[int, int],
+                    seed: int = 42) -> tuple[list[Any], int]:
+    '''Synthetic stream shaped like the ex2 demo, and its item count.
+
+    Numeric and text elements are scalars or lists, logs are always
+    lists of dicts, as in the __main__ demos.
+    '''
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=size)
+    stream: list[Any] = []
+    items = 0
+    for kind in kinds:
+        length = rng.randint(*list_length)
+        scalar = kind != "log" and rng.random() < 0.3
+        if kind == "numeric":
+            values = [rng.choice((rng.randint(-999, 999),
+                                  rng.uniform(-1e3, 1e3)))
+                      for _ in range(length)]
+        elif kind == "text":
+            values = [f"word {rng.randint(0, 9999)}" for _ in range(length)]
+        else:
+            values = [{"log_level": rng.choice(LEVELS),
+                       "log_message": f"event {rng.randint(0, 9999)}"}
+                      for _ in range(length)]
+        if scalar:
+            stream.append(values[0])
+            items += 1
+        else:
+            stream.append(values)
+            items += len(values)
+    return stream, items
+
+
+def bench_pipeline(sizes: list[int]) -> list[dict[str, Any]]:
+    ex2 = load("ex2/data_pipeline.py")
+    results: list[dict[str, Any]] = []
+
+    def new_stream() -> Any:
+        ds = ex2.DataStream()
+        ds.register_processor(ex2.NumericProcessor())
+        ds.register_processor(ex2.TextProcessor())
+        ds.register_processor(ex2.LogProcessor())
+        return ds
+
+    def drain(ds: Any) -> None:
+        for proc in ds.processors:
+            while proc.output(4096):
+                pass
+
+    print("== DataStream pipeline phases ==")
+    for size in sizes:
+        for mix_name, mix in MIXES.items():
+            for length_name, length in LIST_LENGTHS.items():
+                stream, items = generate_stream(size, mix, length)
+                print(f"{size:,} elements, {mix_name}, {length_name} lists"
+                      f" ({items:,} items)")
+
+                ds = new_stream()
+                ds.process_stream(stream[:1000])
+                route = ds.route
+                phases = {"routing": timed(
+                    lambda: [route(element) for element in stream])}
+
+                ds = new_stream()
+                phases["ingest"] = timed(lambda: ds.process_stream(stream))
+                phases["drain"] = timed(lambda: drain(ds))
+
+                for name, writer in (("export_csv", ex2.CSVWriter),
+                                     ("export_jsonl", ex2.JSONLinesWriter)):
+                    ds = new_stream()
+                    ds.process_stream(stream)
+                    with open(os.devnull, "wb") as handle:
+                        phases[name] = timed(
+                            lambda: ds.export_stream(writer(handle)))
+
+                for phase, seconds in phases.items():
+                    count = size if phase == "routing" else items
+                    report(phase, count, seconds)
+                    results.append({
+                        "elements": size,
+                        "items": items,
+                        "mix": mix_name,
+                        "list_length": length_name,
+                        "phase": phase,
+                        "seconds": seconds,
+                        "per_second": count / seconds if seconds else None,
+                    })
+    return results
+
+
+def write_results(path: str, suites: list[str],
+                  results: list[dict[str, Any]]) -> None:
+    document = {
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "suites": suites,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=2)
+    print(f"Results saved to '{path}'")
+
+
+SUITES = ("queues", "numeric", "validation", "logs", "drain", "pipeline")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Code Nexus benchmarks")
+    parser.add_argument("suites", nargs="*", metavar="suite",
+                        help=f"one of {', '.join(SUITES)} (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        help="stream sizes for the size-driven suites")
+    parser.add_argument("--json", metavar="PATH",
+                        help="write pipeline phase timings as JSON")
+    args = parser.parse_args()
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+    suites = args.suites or list(SUITES)
+
+    print("=== Code Nexus - Benchmark ===")
+    results: list[dict[str, Any]] = []
+    if "queues" in suites:
+        bench_queue_backends(args.sizes or [10 ** 4, 10 ** 5, 10 ** 6,
+                                            10 ** 7])
+    if "numeric" in suites:
+        bench_numeric_storage(args.sizes or [10 ** 5, 10 ** 6])
+    if "validation" in suites:
+        bench_batch_validation([10, 10 ** 4, 10 ** 6])
+    if "logs" in suites:
+        bench_log_formatter(args.sizes or [10 ** 5, 10 ** 6])
+    if "drain" in suites:
+        bench_chunked_drain()
+    if "pipeline" in suites:
+        results = bench_pipeline(args.sizes or [10 ** 3, 10 ** 4, 10 ** 5])
+    if args.json:
+        write_results(args.json, suites, results)
@@ -1,13 +1,436 @@
 #!/usr/bin/env python3
 
-from typing import Any
+import json
+import sys
+from typing import Any, Callable, Iterable
 from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from itertools import chain, repeat, starmap
+from string import Formatter
+from threading import Condition
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+
+class ListQueue:
+    '''Original list storage: every popleft shifts the whole list'''
+
+    def __init__(self) -> None:
+        self._items: list[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def append(self, value: Any) -> None:
+        self._items.append(value)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        self._items.extend(values)
+
+    def popleft(self) -> Any:
+        return self._items.pop(0)
+
+    def pop_many(self, n: int) -> list[Any]:
+        taken = self._items[:n]
+        del self._items[:n]
+        return taken
+
+
+class DequeQueue(deque):
+    '''Unbounded FIFO with O(1) appends and pops at both ends.
+
+    Subclasses deque rather than wrapping one, so append, extend and
+    popleft are called straight into C; small batches would otherwise
+    pay more for the wrapper frame than for the copy.
+    '''
+
+    def pop_many(self, n: int) -> list[Any]:
+        n = min(n, len(self))
+        return list(starmap(self.popleft, repeat((), n)))
+
+
+class RingBuffer:
+    '''Fixed capacity FIFO.
+
+    When full, 'overflow' decides what happens to new values:
+    "reject" raises, "drop_oldest" overwrites the oldest value and
+    "block" waits (up to 'timeout' seconds, which it requires) for a
+    consumer thread to make room. "reject" and "block" are all or
+    nothing: a batch is either stored whole or not at all.
+    '''
+
+    policies = ("block", "drop_oldest", "reject")
+
+    def __init__(self, capacity: int, overflow: str = "reject",
+                 timeout: float | None = None) -> None:
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        if overflow not in self.policies:
+            raise ValueError(f"Unknown overflow policy '{overflow}'")
+        if overflow == "block" and timeout is None:
+            raise ValueError("Block overflow needs a timeout")
+        self._items: list[Any] = [None] * capacity
+        self._capacity = capacity
+        self._head = 0
+        self._size = 0
+        self.overflow = overflow
+        self.timeout = timeout
+        self.dropped = 0
+        self._not_full = Condition()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _wait_for_room(self, n: int) -> None:
+        if n > self._capacity or not self._not_full.wait_for(
+                lambda: self._size + n <= self._capacity, self.timeout):
+            raise Exception("Buffer full")
+
+    def _write(self, values: list[Any]) -> None:
+        start = (self._head + self._size) % self._capacity
+        first = min(len(values), self._capacity - start)
+        self._items[start:start + first] = values[:first]
+        self._items[:len(values) - first] = values[first:]
+        self._size += len(values)
+
+    def _drop(self, n: int) -> None:
+        self._head = (self._head + n) % self._capacity
+        self._size -= n
+        self.dropped += n
+
+    def append(self, value: Any) -> None:
+        self.extend((value,))
+
+    def extend(self, values: Iterable[Any]) -> None:
+        values = list(values)
+        with self._not_full:
+            if self.overflow == "reject":
+                if len(values) > self._capacity - self._size:
+                    raise Exception("Buffer full")
+                self._write(values)
+            elif self.overflow == "drop_oldest":
+                if len(values) >= self._capacity:
+                    self.dropped += self._size + len(values) - self._capacity
+                    values = values[-self._capacity:]
+                    self._head = 0
+                    self._size = 0
+                overflow = self._size + len(values) - self._capacity
+                if overflow > 0:
+                    self._drop(overflow)
+                self._write(values)
+            else:
+                self._wait_for_room(len(values))
+                self._write(values)
+
+    def popleft(self) -> Any:
+        with self._not_full:
+            if not self._size:
+                raise IndexError("pop from an empty buffer")
+            value = self._items[self._head]
+            self._items[self._head] = None
+            self._head = (self._head + 1) % self._capacity
+            self._size -= 1
+            self._not_full.notify()
+        return value
+
+    def pop_many(self, n: int) -> list[Any]:
+        with self._not_full:
+            n = max(0, min(n, self._size))
+            end = self._head + n
+            if end <= self._capacity:
+                taken = self._items[self._head:end]
+                self._items[self._head:end] = repeat(None, n)
+            else:
+                end -= self._capacity
+                taken = self._items[self._head:] + self._items[:end]
+                self._items[self._head:] = repeat(
+                    None, self._capacity - self._head)
+                self._items[:end] = repeat(None, end)
+            self._head = end % self._capacity
+            self._size -= n
+            self._not_full.notify_all()
+        return taken
+
+
+def _format_number(value: float, is_int: int) -> str:
+    return str(int(value)) if is_int else repr(value)
+
+
+class ColumnarQueue:
+    '''Numbers kept unboxed in an array('d'), formatted only on output.
+
+    A parallel bytearray remembers which values were ints so that
+    output matches str() of the original value. Ints are stored as
+    doubles, so magnitudes above MAX_EXACT_INT would lose precision
+    (NumericProcessor refuses them, see exact_doubles()).
+    '''
+
+    def __init__(self) -> None:
+        self._values = array("d")
+        self._is_int = bytearray()
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._values) - self._head
+
+    def _detach(self) -> None:
+        '''Move pending values to a fresh array, leaving views on the old'''
+        self._values = self._values[self._head:]
+        del self._is_int[:self._head]
+        self._head = 0
+
+    def append(self, value: int | float) -> None:
+        try:
+            self._values.append(value)
+        except BufferError:
+            self._detach()
+            self._values.append(value)
+        self._is_int.append(isinstance(value, int))
+
+    def extend(self, values: Iterable[int | float],
+               ints: bool | None = None) -> None:
+        '''ints: True/False if the caller knows all values are ints or
+        all floats, which saves checking them one by one'''
+        values = list(values)
+        try:
+            self._values.extend(values)
+        except BufferError:
+            self._detach()
+            self._values.extend(values)
+        if ints is None:
+            self._is_int.extend(map(int.__instancecheck__, values))
+        else:
+            self._is_int.extend(bytes((ints,)) * len(values))
+
+    def _compact(self) -> None:
+        if self._head < 4096 or self._head * 2 < len(self._values):
+            return
+        try:
+            del self._values[:self._head]
+        except BufferError:
+            return
+        del self._is_int[:self._head]
+        self._head = 0
+
+    def popleft(self) -> str:
+        if self._head >= len(self._values):
+            raise IndexError("pop from an empty buffer")
+        head = self._head
+        self._head += 1
+        value = _format_number(self._values[head], self._is_int[head])
+        self._compact()
+        return value
+
+    def pop_many(self, n: int) -> list[str]:
+        start = self._head
+        self._head = min(start + n, len(self._values))
+        taken = list(map(_format_number, self._values[start:self._head],
+                         self._is_int[start:self._head]))
+        self._compact()
+        return taken
+
+    def view(self) -> memoryview:
+        '''Zero-copy view of the values pending right now.
+
+        While a view is alive, a growing queue copies its pending values
+        to a new array instead of resizing, so the view keeps its data.
+        '''
+        return memoryview(self._values)[self._head:]
+
+
+NUMERIC_TYPES = frozenset((int, float))
+TEXT_TYPES = frozenset((str,))
+LOG_TYPES = frozenset((dict,))
+NUMERIC_TYPECODES = "bBhHiIlLqQfd"
+# Below this many values a plain isinstance loop beats building a type set
+SMALL_BATCH = 64
+MAX_EXACT_INT = 2 ** 53  # Larger ints do not survive a round trip as double
+
+
+def exact_doubles(values: list[Any], ints: bool | None) -> bool:
+    '''Can every int in values be stored as a double without change?
+
+    ints is True/False when values are known to be all ints or all
+    floats, None when they have to be picked out one by one.
+    '''
+    if ints is False:
+        return True
+    found = values if ints else filter(int.__instancecheck__, values)
+    return max(map(abs, found), default=0) <= MAX_EXACT_INT
+
+
+def homogeneous(values: Iterable[Any], allowed: frozenset[type]) -> bool:
+    '''One C-level pass: do all values have an exact type in 'allowed'?'''
+    return set(map(type, values)) <= allowed
+
+
+def make_queue(backend: str = "deque", capacity: int | None = None,
+               overflow: str = "reject",
+               timeout: float | None = None) -> Any:
+    if backend == "list":
+        return ListQueue()
+    if backend == "deque":
+        return DequeQueue()
+    if backend == "columnar":
+        return ColumnarQueue()
+    if backend == "ring":
+        if capacity is None:
+            raise ValueError("Ring backend needs a capacity")
+        return RingBuffer(capacity, overflow, timeout)
+    raise ValueError(f"Unknown queue backend '{backend}'")
+
+
+LOG_FIELDS = ("log_level", "log_message")
+
+
+_json_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def _kv_quote(value: Any) -> str:
+    text = str(value)
+    if not text or " " in text or '"' in text or "=" in text \
+            or "\n" in text:
+        return _json_encode(text)
+    return text
+
+
+def _keep(value: Any) -> Any:
+    return "None" if value is None else value
+
+
+def _same(value: Any) -> Any:
+    return value
+
+
+def _interned(render: Callable[[Any], Any],
+              limit: int = 1024) -> Callable[[Any], Any]:
+    '''Memoize render() for a field with few distinct values (levels)'''
+    cache: dict[str, Any] = {}
+
+    def render_cached(value: Any) -> Any:
+        try:
+            return cache[value]
+        except (KeyError, TypeError):
+            pass
+        text = render(value)
+        if isinstance(value, str) and len(cache) < limit:
+            cache[sys.intern(value)] = text
+        return text
+    return render_cached
+
+
+class LogFormatter:
+    '''Log layout compiled once into a str.format() template.
+
+    layout is one of:
+    - "template": 'template' with named fields, e.g. "{log_level}: ..."
+    - "kv": level=INFO message="..." pairs, quoted only when needed
+    - "json": one JSON object per log
+    - "columns": fixed width columns, 'widths' for the leading fields
+    Missing keys render as None (null in JSON) instead of raising.
+    Each field becomes a positional slot of one template, filled by
+    log.get() and the field's render, if any.
+    '''
+
+    layouts = ("template", "kv", "json", "columns")
+
+    def __init__(self, layout: str = "template",
+                 template: str = "{log_level}: {log_message}",
+                 fields: Iterable[str] = LOG_FIELDS,
+                 widths: Iterable[int] = (8,),
+                 interned: Iterable[str] = ("log_level",)) -> None:
+        if layout not in self.layouts:
+            raise ValueError(f"Unknown log layout '{layout}'")
+        fields = tuple(fields)
+        # Each part is a literal str or (field, render, conversion, spec)
+        parts: list[Any] = []
+        if layout == "template":
+            parts = self._parse(template)
+            fields = tuple(part[0] for part in parts
+                           if not isinstance(part, str))
+        elif layout == "kv":
+            for i, name in enumerate(fields):
+                parts += [" " * bool(i) + f"{name}=",
+                          (name, _kv_quote, "", "")]
+        elif layout == "json":
+            for i, name in enumerate(fields):
+                parts += [("{" if i == 0 else ", ") + json.dumps(name) + ": ",
+                          (name, _json_encode, "", "")]
+            parts.append("}" if fields else "{}")
+        else:
+            specs = [f"<{width}.{width}" for width in widths]
+            for i, name in enumerate(fields):
+                parts += [" " * bool(i),
+                          (name, str, "", specs[i] if i < len(specs)
+                           else "")]
+        interned = set(interned)
+        parts = [part if isinstance(part, str) or part[1] is None
+                 or part[0] not in interned
+                 else (part[0], _interned(part[1])) + part[2:]
+                 for part in parts]
+        self.layout = layout
+        self.fields = fields
+        self.format, self.format_batch = self._build(parts)
+
+    @staticmethod
+    def _parse(template: str) -> list[Any]:
+        parts: list[Any] = []
+        for literal, name, spec, conversion in Formatter().parse(template):
+            parts.append(literal)
+            if name is not None:
+                if "{" in (spec or ""):
+                    raise ValueError("Nested fields are not supported in "
+                                     "log templates")
+                # None has no format spec, so only then is it made a str
+                render = _keep if spec or conversion else None
+                parts.append((name, render, conversion or "", spec or ""))
+        return parts
+
+    @staticmethod
+    def _build(parts: list[Any]) -> tuple[Callable[..., str],
+                                          Callable[..., list[str]]]:
+        '''format(log) and format_batch(logs) for the parts'''
+        template = []
+        names = []
+        renders = []
+        for part in parts:
+            if isinstance(part, str):
+                template.append(part.replace("{", "{{").replace("}", "}}"))
+                continue
+            name, render, conversion, spec = part
+            if conversion not in ("", "r", "s", "a"):
+                raise ValueError(f"Unknown conversion '!{conversion}'")
+            template.append("{" + ("!" + conversion) * bool(conversion)
+                            + (":" + spec) * bool(spec) + "}")
+            names.append(name)
+            renders.append(render or _same)
+        fill = "".join(template).format
+
+        if all(render is _same for render in renders):
+            def format(log: dict[str, Any]) -> str:
+                return fill(*map(log.get, names))
+        else:
+            fields = tuple(zip(names, renders))
+
+            def format(log: dict[str, Any]) -> str:
+                return fill(*[render(log.get(name))
+                              for name, render in fields])
+
+        def format_batch(logs: Iterable[dict[str, Any]]) -> list[str]:
+            return list(map(format, logs))
+        return format, format_batch
 
 
 class DataProcessor(ABC):
 
-    def __init__(self):
-        self._stack: list[str] = []
+    def __init__(self, backend: str = "deque", capacity: int | None = None,
+                 overflow: str = "reject",
+                 timeout: float | None = None) -> None:
+        self._stack = make_queue(backend, capacity, overflow, timeout)
         self._counter: int = 0
 
     @abstractmethod
@@ -21,63 +444,131 @@ class DataProcessor(ABC):
     def output(self) -> tuple[int, str]:
         if not self._stack:
             raise Exception("No data available.")
-        value = self._stack.pop(0)
+        value = self._stack.popleft()
         count = self._counter
         self._counter += 1
         return (count, value)
 
+    def output_many(self, n: int) -> list[tuple[int, str]]:
+        '''Take up to n values at once, empty list when nothing is left'''
+        if n < 0:
+            raise ValueError("Cannot take a negative number of values")
+        taken = self._stack.pop_many(n)
+        start = self._counter
+        self._counter += len(taken)
+        return list(zip(range(start, self._counter), taken))
+
 
 class NumericProcessor(DataProcessor):
 
+    def __init__(self, backend: str = "deque", capacity: int | None = None,
+                 overflow: str = "reject", timeout: float | None = None,
+                 columnar: bool = False) -> None:
+        if columnar:
+            backend = "columnar"
+        super().__init__(backend, capacity, overflow, timeout)
+        self.columnar = backend == "columnar"
+
     def _is_valid_number(self, data: Any) -> bool:
         return isinstance(data, (int, float)) and not isinstance(data, bool)
 
-    def validate(self, data: Any) -> bool:
+    def _batch(self, data: Any) -> tuple[list[Any], bool | None] | None:
+        '''(values, ints) to store if data is valid, None otherwise.
+
+        Columnar storage also refuses ints beyond MAX_EXACT_INT, which
+        would overflow or silently change once stored as doubles.
+        '''
+        batch = self._scan(data)
+        if batch is None or not self.columnar or exact_doubles(*batch):
+            return batch
+        return None
+
+    def _scan(self, data: Any) -> tuple[list[Any], bool | None] | None:
+        '''Plain int/float lists are accepted by a single type scan whose
+        result also tells whether they are all ints (True), all floats
+        (False) or mixed (None); lists holding subclasses fall back to
+        the per-element isinstance check.
+        '''
         if self._is_valid_number(data):
-            return True
+            return ([data], isinstance(data, int))
         if isinstance(data, list):
-            for value in data:
-                if not self._is_valid_number(value):
-                    return False
-            return True
-        return False
+            kinds = set(map(type, data))
+            if kinds <= NUMERIC_TYPES:
+                return (data, None if len(kinds) != 1 else int in kinds)
+            if all(map(self._is_valid_number, data)):
+                return (data, None)
+            return None
+        if isinstance(data, array):
+            return (data.tolist(), data.typecode not in "fd") \
+                if data.typecode in NUMERIC_TYPECODES else None
+        if np is not None and isinstance(data, np.ndarray):
+            return (data.ravel().tolist(), data.dtype.kind != "f") \
+                if data.dtype.kind in "iuf" else None
+        return None
 
-    def ingest(self, data: Any) -> None:
+    def validate(self, data: Any) -> bool:
+        return self._batch(data) is not None
 
-        if not self.validate(data):
+    def ingest(self, data: Any) -> None:
+        batch = self._batch(data)
+        if batch is None:
             raise Exception("Improper numeric data")
 
-        if isinstance(data, list):
-            for value in data:
-                self._stack.append(str(value))
+        values, ints = batch
+        if self.columnar:
+            self._stack.extend(values, ints)
         else:
-            self._stack.append(str(data))
+            self._stack.extend(map(str, values))
+
+    def view(self) -> memoryview:
+        '''Pending values as doubles, without copying or formatting.
+
+        Ingesting while the view is held copies the pending values once
+        instead of failing; the view does not see the new values.
+        '''
+        if not self.columnar:
+            raise Exception("Numeric views need columnar storage")
+        return self._stack.view()
+
+    def ndarray(self) -> Any:
+        '''Same as view() wrapped as a NumPy array (numpy is optional)'''
+        if np is None:
+            raise Exception("numpy is not installed")
+        return np.frombuffer(self.view(), dtype=np.float64)
 
 
 class TextProcessor(DataProcessor):
 
-    def validate(self, data: Any) -> bool:
+    def _batch(self, data: Any) -> list[str] | None:
         if isinstance(data, str):
-            return True
+            return [data]
+        if not isinstance(data, list):
+            return None
+        if len(data) > SMALL_BATCH and homogeneous(data, TEXT_TYPES):
+            return data
+        for value in data:
+            if not isinstance(value, str):
+                return None
+        return data
 
-        if isinstance(data, list):
-            for value in data:
-                if not isinstance(value, str):
-                    return False
-            return True
-        return False
+    def validate(self, data: Any) -> bool:
+        return self._batch(data) is not None
 
     def ingest(self, data: Any) -> None:
-        if not self.validate(data):
+        values = self._batch(data)
+        if values is None:
             raise Exception("Improper text data")
-        if isinstance(data, list):
-            self._stack.extend(data)
-        else:
-            self._stack.append(data)
+        self._stack.extend(values)
 
 
 class LogProcessor(DataProcessor):
 
+    def __init__(self, backend: str = "deque", capacity: int | None = None,
+                 overflow: str = "reject", timeout: float | None = None,
+                 formatter: LogFormatter | None = None) -> None:
+        super().__init__(backend, capacity, overflow, timeout)
+        self.formatter = formatter or LogFormatter()
+
     def _is_valid_log(self, data: Any) -> bool:
 
         if not isinstance(data, dict):
@@ -86,28 +577,28 @@ class LogProcessor(DataProcessor):
         return all(isinstance(key, str) and isinstance(value, str)
                    for key, value in data.items())
 
-    def validate(self, data: Any) -> bool:
-
-        if self._is_valid_log(data):
-            return True
+    def _batch(self, data: Any) -> list[dict[str, str]] | None:
+        if isinstance(data, dict):
+            data = [data]
+        elif not isinstance(data, list):
+            return None
+        if homogeneous(data, LOG_TYPES):
+            fields = chain.from_iterable(
+                chain.from_iterable(map(dict.items, data)))
+            if homogeneous(fields, TEXT_TYPES):
+                return data
+        if all(map(self._is_valid_log, data)):
+            return data
+        return None
 
-        if isinstance(data, list):
-            return all(self._is_valid_log(value) for value in data)
-
-        return False
+    def validate(self, data: Any) -> bool:
+        return self._batch(data) is not None
 
     def ingest(self, data: Any) -> None:
-        if not self.validate(data):
+        values = self._batch(data)
+        if values is None:
             raise Exception("Improper log data")
-
-        def format_log(d: dict[str, str]) -> str:
-            return f"{d.get('log_level')}: {d.get('log_message')}"
-
-        if isinstance(data, list):
-            for value in data:
-                self._stack.append(format_log(value))
-        else:
-            self._stack.append(format_log(data))
+        self._stack.extend(self.formatter.format_batch(values))
 
 
 def demo_nexus():
@@ -1,14 +1,60 @@
 #!/usr/bin/env python3
 
-from typing import Any
+from typing import Any, Iterable, Iterator
 from abc import ABC, abstractmethod
+from itertools import islice
+
+
+class CursorBuffer:
+    '''FIFO list read through a cursor instead of re-slicing.
+
+    take(n) copies only the n items it returns; consumed slots are
+    dropped in one compaction once they make up half of the list.
+    '''
+
+    def __init__(self, compact_min: int = 1024) -> None:
+        self._items: list[Any] = []
+        self._head = 0
+        self.compact_min = compact_min
+
+    def __len__(self) -> int:
+        return len(self._items) - self._head
+
+    def __iter__(self) -> Iterator[Any]:
+        return islice(self._items, self._head, None)
+
+    def append(self, value: Any) -> None:
+        self._items.append(value)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        self._items.extend(values)
+
+    def peek(self, n: int) -> Iterator[Any]:
+        '''Iterate over the next n items without copying or consuming'''
+        return islice(self._items, self._head, self._head + n)
+
+    def take(self, n: int) -> list[Any]:
+        start = self._head
+        self._head = min(start + n, len(self._items))
+        taken = self._items[start:self._head]
+        self._compact()
+        return taken
+
+    def _compact(self) -> None:
+        if self._head == len(self._items):
+            self._items.clear()
+            self._head = 0
+        elif (self._head >= self.compact_min
+              and self._head * 2 >= len(self._items)):
+            del self._items[:self._head]
+            self._head = 0
 
 
 class DataProcessor(ABC):
     '''Estructura común de todos los procesadores'''
     name: str
     total_processor: int
-    buffer: list[any]
+    buffer: CursorBuffer
 
     @abstractmethod
     def can_process(self, data: Any) -> bool:
@@ -23,24 +69,49 @@ class DataProcessor(ABC):
         pass
 
 
+def shape_of(element: Any) -> tuple[type, Any]:
+    '''Routing key: the element type, plus the inner types of a list'''
+    if isinstance(element, list):
+        return (list, frozenset(map(type, element)))
+    return (type(element), None)
+
+
 class DataStream:
+    '''Routes each element to the first processor that can handle it.
+
+    can_process() is only asked once per element shape (see shape_of);
+    the answer is cached until another processor is registered, so
+    processors must decide from types alone, not from values.
+    '''
+
     def __init__(self):
         self.processors: list[DataProcessor] = []
+        self._routes: dict[tuple[type, Any], DataProcessor | None] = {}
 
     def register_processor(self, proc: DataProcessor) -> None:
         self.processors.append(proc)
+        self._routes.clear()
+
+    def route(self, element: Any) -> DataProcessor | None:
+        key = shape_of(element)
+        try:
+            return self._routes[key]
+        except KeyError:
+            pass
+        target = None
+        for proc in self.processors:
+            if proc.can_process(element):
+                target = proc
+                break
+        self._routes[key] = target
+        return target
 
     def process_stream(self, stream: list[Any]) -> None:
         for element in stream:
-            handled = False
-
-            for proc in self.processors:
-                if proc.can_process(element):
-                    proc.process(element)
-                    handled = True
-                    break
-
-            if not handled:
+            proc = self.route(element)
+            if proc is not None:
+                proc.process(element)
+            else:
                 print(f"DataStream error - Can't process"
                       f"element in stream {element}")
 
@@ -61,7 +132,7 @@ class NumericProcessor(DataProcessor):
     def __init__(self) -> None:
         self.name = "Numeric Processor"
         self.total_processed = 0
-        self.buffer: list[Any] = []
+        self.buffer = CursorBuffer()
 
     def can_process(self, data: Any) -> bool:
         return (isinstance(data, (int, float)) or isinstance(data, list)
@@ -73,8 +144,7 @@ class NumericProcessor(DataProcessor):
             self.total_processed += len(data)
 
     def output(self, n: int) -> list[Any]:
-        taken = self.buffer[:n]
-        self.buffer = self.buffer[n:]
+        taken = self.buffer.take(n)
         return taken
 
 
@@ -82,7 +152,7 @@ class TextProcessor(DataProcessor):
     def __init__(self) -> None:
         self.name = "Text Processor"
         self.total_processed = 0
-        self.buffer: list[Any] = []
+        self.buffer = CursorBuffer()
 
     def can_process(self, data: Any) -> bool:
         return (isinstance(data, str) or (isinstance(data, list)
@@ -97,8 +167,7 @@ class TextProcessor(DataProcessor):
             self.total_processed += 1
 
     def output(self, n: int) -> list[Any]:
-        taken = self.buffer[:n]
-        self.buffer = self.buffer[n:]
+        taken = self.buffer.take(n)
         return taken
 
 
@@ -106,7 +175,7 @@ class LogProcessor(DataProcessor):
     def __init__(self) -> None:
         self.name = "Log Processor"
         self.total_processed = 0
-        self.buffer: list[Any] = []
+        self.buffer = CursorBuffer()
 
     def can_process(self, data: Any) -> bool:
         return (isinstance(data, list)
@@ -117,8 +186,7 @@ class LogProcessor(DataProcessor):
         self.total_processed += len(data)
 
     def output(self, n: int) -> list[Any]:
-        taken = self.buffer[:n]
-        self.buffer = self.buffer[n:]
+        taken = self.buffer.take(n)
         return taken
 
 
@@ -1,13 +1,324 @@
 #!/usr/bin/env python3
 
+import asyncio
+import csv
+import io
+import json
+import marshal
+import mmap
+import os
+import socket
+import struct
+import sys
+import tempfile
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Protocol
+from bisect import bisect_left
+from collections import deque
+from itertools import islice
+from queue import Queue
+from string import Formatter
+from threading import Thread
+from typing import (Any, AsyncIterable, BinaryIO, Callable, Iterable,
+                    Iterator, Protocol)
+
+
+class CursorBuffer:
+    '''FIFO list read through a cursor instead of re-slicing.
+
+    take(n) copies only the n items it returns; consumed slots are
+    dropped in one compaction once they make up half of the list.
+    '''
+
+    def __init__(self, compact_min: int = 1024) -> None:
+        self._items: list[Any] = []
+        self._head = 0
+        self.compact_min = compact_min
+
+    def __len__(self) -> int:
+        return len(self._items) - self._head
+
+    def __iter__(self) -> Iterator[Any]:
+        return islice(self._items, self._head, None)
+
+    def append(self, value: Any) -> None:
+        self._items.append(value)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        self._items.extend(values)
+
+    def peek(self, n: int) -> Iterator[Any]:
+        '''Iterate over the next n items without copying or consuming'''
+        return islice(self._items, self._head, self._head + n)
+
+    def tail(self, n: int) -> list[Any]:
+        '''Copy of the n most recently added items'''
+        n = min(n, len(self))
+        return self._items[len(self._items) - n:] if n else []
+
+    def take(self, n: int) -> list[Any]:
+        start = self._head
+        self._head = min(start + n, len(self._items))
+        taken = self._items[start:self._head]
+        self._compact()
+        return taken
+
+    def _compact(self) -> None:
+        if self._head == len(self._items):
+            self._items.clear()
+            self._head = 0
+        elif (self._head >= self.compact_min
+              and self._head * 2 >= len(self._items)):
+            del self._items[:self._head]
+            self._head = 0
+
+
+class SpillBuffer:
+    '''CursorBuffer that moves its oldest items to disk past a threshold.
+
+    Once more than 'threshold' items sit in memory, the oldest
+    'segment_size' of them are marshal-encoded and appended to a
+    temporary segment file. take() reads segments back in order, so
+    the FIFO order is unchanged. Items must be marshal-able (numbers,
+    strings, dicts and lists of those).
+    '''
+
+    def __init__(self, threshold: int, segment_size: int | None = None,
+                 spill_dir: str | None = None) -> None:
+        if threshold <= 0:
+            raise ValueError("Spill threshold must be positive")
+        self.threshold = threshold
+        self.segment_size = segment_size or max(1, threshold // 2)
+        self.spill_dir = spill_dir
+        self.on_disk = 0
+        self._memory = CursorBuffer()
+        self._loaded = CursorBuffer()
+        self._segments: deque[tuple[int, int, int]] = deque()
+        self._file: BinaryIO | None = None
+
+    def __len__(self) -> int:
+        return self.in_memory + self.on_disk
+
+    @property
+    def in_memory(self) -> int:
+        return len(self._loaded) + len(self._memory)
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self._loaded
+        for offset, size, _ in list(self._segments):
+            yield from self._read(offset, size)
+        yield from self._memory
+
+    def append(self, value: Any) -> None:
+        self._memory.append(value)
+        self._spill()
+
+    def extend(self, values: Iterable[Any]) -> None:
+        self._memory.extend(values)
+        self._spill()
+
+    def peek(self, n: int) -> Iterator[Any]:
+        return islice(iter(self), n)
+
+    def tail(self, n: int) -> list[Any]:
+        if n <= len(self._memory):
+            return self._memory.tail(n)
+        return list(islice(iter(self), max(0, len(self) - n), None))
+
+    def take(self, n: int) -> list[Any]:
+        taken: list[Any] = []
+        while len(taken) < n:
+            if not self._loaded and self._segments:
+                self._load()
+            source = self._loaded if self._loaded else self._memory
+            if not source:
+                break
+            taken.extend(source.take(n - len(taken)))
+        return taken
+
+    def _spill(self) -> None:
+        while len(self._memory) > self.threshold:
+            values = self._memory.take(self.segment_size)
+            if self._file is None:
+                self._file = tempfile.TemporaryFile(dir=self.spill_dir)
+            payload = marshal.dumps(values)
+            offset = self._file.seek(0, 2)
+            self._file.write(payload)
+            self._segments.append((offset, len(payload), len(values)))
+            self.on_disk += len(values)
+
+    def _read(self, offset: int, size: int) -> list[Any]:
+        self._file.seek(offset)
+        return marshal.loads(self._file.read(size))
+
+    def _load(self) -> None:
+        offset, size, count = self._segments.popleft()
+        self._loaded.extend(self._read(offset, size))
+        self.on_disk -= count
+        if not self._segments:
+            self._file.seek(0)
+            self._file.truncate()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._segments.clear()
+            self.on_disk = 0
+
+
+def make_buffer(spill_threshold: int | None = None,
+                spill_dir: str | None = None) -> CursorBuffer | SpillBuffer:
+    if spill_threshold is None:
+        return CursorBuffer()
+    return SpillBuffer(spill_threshold, spill_dir=spill_dir)
+
+
+LOG_FIELDS = ("log_level", "log_message")
+
+
+_json_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def _kv_quote(value: Any) -> str:
+    text = str(value)
+    if not text or " " in text or '"' in text or "=" in text \
+            or "\n" in text:
+        return _json_encode(text)
+    return text
+
+
+def _keep(value: Any) -> Any:
+    return "None" if value is None else value
+
+
+def _same(value: Any) -> Any:
+    return value
+
+
+def _interned(render: Callable[[Any], Any],
+              limit: int = 1024) -> Callable[[Any], Any]:
+    '''Memoize render() for a field with few distinct values (levels)'''
+    cache: dict[str, Any] = {}
+
+    def render_cached(value: Any) -> Any:
+        try:
+            return cache[value]
+        except (KeyError, TypeError):
+            pass
+        text = render(value)
+        if isinstance(value, str) and len(cache) < limit:
+            cache[sys.intern(value)] = text
+        return text
+    return render_cached
+
+
+class LogFormatter:
+    '''Log layout compiled once into a str.format() template.
+
+    layout is one of:
+    - "template": 'template' with named fields, e.g. "{log_level}: ..."
+    - "kv": level=INFO message="..." pairs, quoted only when needed
+    - "json": one JSON object per log
+    - "columns": fixed width columns, 'widths' for the leading fields
+    Missing keys render as None (null in JSON) instead of raising.
+    Each field becomes a positional slot of one template, filled by
+    log.get() and the field's render, if any.
+    '''
+
+    layouts = ("template", "kv", "json", "columns")
+
+    def __init__(self, layout: str = "template",
+                 template: str = "{log_level}: {log_message}",
+                 fields: Iterable[str] = LOG_FIELDS,
+                 widths: Iterable[int] = (8,),
+                 interned: Iterable[str] = ("log_level",)) -> None:
+        if layout not in self.layouts:
+            raise ValueError(f"Unknown log layout '{layout}'")
+        fields = tuple(fields)
+        # Each part is a literal str or (field, render, conversion, spec)
+        parts: list[Any] = []
+        if layout == "template":
+            parts = self._parse(template)
+            fields = tuple(part[0] for part in parts
+                           if not isinstance(part, str))
+        elif layout == "kv":
+            for i, name in enumerate(fields):
+                parts += [" " * bool(i) + f"{name}=",
+                          (name, _kv_quote, "", "")]
+        elif layout == "json":
+            for i, name in enumerate(fields):
+                parts += [("{" if i == 0 else ", ") + json.dumps(name) + ": ",
+                          (name, _json_encode, "", "")]
+            parts.append("}" if fields else "{}")
+        else:
+            specs = [f"<{width}.{width}" for width in widths]
+            for i, name in enumerate(fields):
+                parts += [" " * bool(i),
+                          (name, str, "", specs[i] if i < len(specs)
+                           else "")]
+        interned = set(interned)
+        parts = [part if isinstance(part, str) or part[1] is None
+                 or part[0] not in interned
+                 else (part[0], _interned(part[1])) + part[2:]
+                 for part in parts]
+        self.layout = layout
+        self.fields = fields
+        self.format, self.format_batch = self._build(parts)
+
+    @staticmethod
+    def _parse(template: str) -> list[Any]:
+        parts: list[Any] = []
+        for literal, name, spec, conversion in Formatter().parse(template):
+            parts.append(literal)
+            if name is not None:
+                if "{" in (spec or ""):
+                    raise ValueError("Nested fields are not supported in "
+                                     "log templates")
+                # None has no format spec, so only then is it made a str
+                render = _keep if spec or conversion else None
+                parts.append((name, render, conversion or "", spec or ""))
+        return parts
+
+    @staticmethod
+    def _build(parts: list[Any]) -> tuple[Callable[..., str],
+                                          Callable[..., list[str]]]:
+        '''format(log) and format_batch(logs) for the parts'''
+        template = []
+        names = []
+        renders = []
+        for part in parts:
+            if isinstance(part, str):
+                template.append(part.replace("{", "{{").replace("}", "}}"))
+                continue
+            name, render, conversion, spec = part
+            if conversion not in ("", "r", "s", "a"):
+                raise ValueError(f"Unknown conversion '!{conversion}'")
+            template.append("{" + ("!" + conversion) * bool(conversion)
+                            + (":" + spec) * bool(spec) + "}")
+            names.append(name)
+            renders.append(render or _same)
+        fill = "".join(template).format
+
+        if all(render is _same for render in renders):
+            def format(log: dict[str, Any]) -> str:
+                return fill(*map(log.get, names))
+        else:
+            fields = tuple(zip(names, renders))
+
+            def format(log: dict[str, Any]) -> str:
+                return fill(*[render(log.get(name))
+                              for name, render in fields])
+
+        def format_batch(logs: Iterable[dict[str, Any]]) -> list[str]:
+            return list(map(format, logs))
+        return format, format_batch
 
 
 class DataProcessor(ABC):
     name: str
     total_processed: int
-    buffer: list[Any]
+    buffer: CursorBuffer | SpillBuffer
 
     @abstractmethod
     def can_process(self, data: Any) -> bool:
@@ -27,24 +338,351 @@ class ExportPlugin(Protocol):
         pass
 
 
+class StreamingExportPlugin(ExportPlugin, Protocol):
+    '''Plugin that writes batches as they come: open, write..., close'''
+
+    def open(self) -> None:
+        pass
+
+    def write_batch(self, data: Iterable[tuple[int, str]]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class Sink:
+    '''Registered export target with its own counters.
+
+    A threaded sink gets a worker thread and queue of its own, so a
+    slow plugin does not hold up the others; its batches keep their
+    order. latency is measured from send() to the end of the plugin
+    call, throughput over the time spent inside the plugin. A failing
+    plugin call is reported and its batch dropped, threaded or not.
+    Streaming plugins are opened here and closed by close(), once the
+    worker has written everything that was sent.
+    '''
+
+    _STOP = object()
+
+    def __init__(self, plugin: ExportPlugin, threaded: bool = False,
+                 max_pending: int = 0) -> None:
+        self.plugin = plugin
+        self.batches = 0
+        self.records = 0
+        self.busy = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._queue: Queue | None = None
+        self._worker: Thread | None = None
+        self._opened = False
+        if hasattr(plugin, "open"):
+            plugin.open()
+            self._opened = True
+        if threaded:
+            self._queue = Queue(max_pending)
+            self._worker = Thread(target=self._work, daemon=True,
+                                  name=f"{type(plugin).__name__} sink")
+            self._worker.start()
+
+    def send(self, data: list[tuple[int, str]]) -> None:
+        if self._queue is not None:
+            self._queue.put((time.perf_counter(), data))
+        else:
+            self._deliver(time.perf_counter(), data)
+
+    def _deliver(self, sent: float, data: list[tuple[int, str]]) -> None:
+        start = time.perf_counter()
+        try:
+            self.plugin.process_output(data)
+        except Exception as error:
+            print(f"Sink error - {type(self.plugin).__name__}: {error}")
+            return
+        end = time.perf_counter()
+        self.batches += 1
+        self.records += len(data)
+        self.busy += end - start
+        self.total_latency += end - sent
+        self.max_latency = max(self.max_latency, end - sent)
+
+    def _work(self) -> None:
+        queue = self._queue
+        while True:
+            item = queue.get()
+            try:
+                if item is self._STOP:
+                    return
+                self._deliver(*item)
+            finally:
+                queue.task_done()
+
+    def wait(self) -> None:
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._queue.put(self._STOP)
+            self._worker.join()
+            self._worker = None
+            self._queue = None
+        if self._opened:
+            self._opened = False
+            self.plugin.close()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "batches": self.batches,
+            "records": self.records,
+            "busy_s": self.busy,
+            "avg_latency_s": (self.total_latency / self.batches
+                              if self.batches else 0.0),
+            "max_latency_s": self.max_latency,
+            "records_per_s": self.records / self.busy if self.busy else 0.0,
+        }
+
+
+LATENCY_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+
+
+class Histogram:
+    '''Histogram with fixed upper bounds, read back cumulatively'''
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),),
+                                self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else str(bound),
+                           total))
+        return result
+
+
+class ProcessorMetrics:
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self.ingested = 0
+        self.ingest_seconds = 0.0
+        self.can_process_calls = 0
+        self.can_process_seconds = 0.0
+        self.high_water = 0
+        self.output_latency = Histogram(buckets)
+
+
+class Metrics:
+    '''Counters recorded by a DataStream once enable_metrics() is called.
+
+    Processors are keyed by name. snapshot() returns plain dicts and
+    prometheus_text() the Prometheus text exposition format, which can
+    be written to a file or sent to a local (unix) socket.
+    '''
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.started = time.perf_counter()
+        self.routing_misses = 0
+        self.unroutable = 0
+        self.processors: dict[str, ProcessorMetrics] = {}
+
+    def of(self, proc: "DataProcessor") -> ProcessorMetrics:
+        try:
+            return self.processors[proc.name]
+        except KeyError:
+            metrics = ProcessorMetrics(self.buckets)
+            self.processors[proc.name] = metrics
+            return metrics
+
+    def can_process(self, proc: "DataProcessor", element: Any) -> bool:
+        metrics = self.of(proc)
+        start = time.perf_counter()
+        accepted = proc.can_process(element)
+        metrics.can_process_seconds += time.perf_counter() - start
+        metrics.can_process_calls += 1
+        return accepted
+
+    def ingest(self, proc: "DataProcessor", element: Any) -> None:
+        metrics = self.of(proc)
+        before = proc.total_processed
+        start = time.perf_counter()
+        proc.process(element)
+        metrics.ingest_seconds += time.perf_counter() - start
+        metrics.ingested += proc.total_processed - before
+        metrics.high_water = max(metrics.high_water, len(proc.buffer))
+
+    def output(self, proc: "DataProcessor",
+               n: int) -> list[tuple[int, str]]:
+        start = time.perf_counter()
+        data = proc.output(n)
+        self.of(proc).output_latency.observe(time.perf_counter() - start)
+        return data
+
+    def snapshot(self) -> dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "elapsed_s": elapsed,
+            "routing_misses": self.routing_misses,
+            "unroutable": self.unroutable,
+            "processors": {
+                name: {
+                    "ingested": m.ingested,
+                    "ingest_rate": m.ingested / elapsed if elapsed else 0.0,
+                    "ingest_seconds": m.ingest_seconds,
+                    "can_process_calls": m.can_process_calls,
+                    "can_process_seconds": m.can_process_seconds,
+                    "buffer_high_water": m.high_water,
+                    "output_latency": {
+                        "buckets": dict(m.output_latency.cumulative()),
+                        "sum": m.output_latency.sum,
+                        "count": m.output_latency.count,
+                    },
+                }
+                for name, m in self.processors.items()
+            },
+        }
+
+    def prometheus_text(self) -> str:
+        prefix = "code_nexus"
+        lines = [
+            f"# TYPE {prefix}_routing_misses_total counter",
+            f"{prefix}_routing_misses_total {self.routing_misses}",
+            f"# TYPE {prefix}_unroutable_total counter",
+            f"{prefix}_unroutable_total {self.unroutable}",
+        ]
+        series = (
+            ("ingested_total", "counter", lambda m: m.ingested),
+            ("ingest_seconds_total", "counter", lambda m: m.ingest_seconds),
+            ("can_process_calls_total", "counter",
+             lambda m: m.can_process_calls),
+            ("can_process_seconds_total", "counter",
+             lambda m: m.can_process_seconds),
+            ("buffer_high_water", "gauge", lambda m: m.high_water),
+        )
+        for suffix, kind, value in series:
+            lines.append(f"# TYPE {prefix}_processor_{suffix} {kind}")
+            for name, m in self.processors.items():
+                lines.append(f"{prefix}_processor_{suffix}"
+                             f"{{processor={json.dumps(name)}}} {value(m)}")
+        histogram = f"{prefix}_processor_output_latency_seconds"
+        lines.append(f"# TYPE {histogram} histogram")
+        for name, m in self.processors.items():
+            label = f"processor={json.dumps(name)}"
+            for bound, count in m.output_latency.cumulative():
+                lines.append(f'{histogram}_bucket{{{label},le="{bound}"}}'
+                             f" {count}")
+            lines.append(f"{histogram}_sum{{{label}}}"
+                         f" {m.output_latency.sum}")
+            lines.append(f"{histogram}_count{{{label}}}"
+                         f" {m.output_latency.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        '''Replace path atomically so scrapers never read half a file'''
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def send_prometheus(self, socket_path: str) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            sock.sendall(self.prometheus_text().encode("utf-8"))
+
+
+def shape_of(element: Any) -> tuple[type, Any]:
+    '''Routing key: the element type, plus the inner types of a list'''
+    if isinstance(element, list):
+        return (list, frozenset(map(type, element)))
+    return (type(element), None)
+
+
 class DataStream:
+    '''Routes each element to the first processor that can handle it.
+
+    can_process() is only asked once per element shape (see shape_of);
+    the answer is cached until another processor is registered, so
+    processors must decide from types alone, not from values.
+    '''
+
     def __init__(self) -> None:
         self.processors: list[DataProcessor] = []
+        self.sinks: list[Sink] = []
+        self._routes: dict[tuple[type, Any], DataProcessor | None] = {}
+        self.metrics: Metrics | None = None
+
+    def enable_metrics(self,
+                       buckets: Iterable[float] = LATENCY_BUCKETS) -> Metrics:
+        self.metrics = Metrics(buckets)
+        return self.metrics
+
+    def disable_metrics(self) -> None:
+        self.metrics = None
 
     def register_processor(self, proc: DataProcessor) -> None:
         self.processors.append(proc)
+        self._routes.clear()
+
+    def register_sink(self, plugin: ExportPlugin,
+                      threaded: bool = False) -> Sink:
+        sink = Sink(plugin, threaded)
+        self.sinks.append(sink)
+        return sink
+
+    def route(self, element: Any) -> DataProcessor | None:
+        key = shape_of(element)
+        try:
+            return self._routes[key]
+        except KeyError:
+            pass
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.routing_misses += 1
+        target = None
+        for proc in self.processors:
+            if (proc.can_process(element) if metrics is None
+                    else metrics.can_process(proc, element)):
+                target = proc
+                break
+        self._routes[key] = target
+        return target
+
+    def _ingest(self, proc: DataProcessor, element: Any) -> None:
+        if self.metrics is None:
+            proc.process(element)
+        else:
+            self.metrics.ingest(proc, element)
+
+    def _output(self, proc: DataProcessor, n: int) -> list[tuple[int, str]]:
+        if self.metrics is None:
+            return proc.output(n)
+        return self.metrics.output(proc, n)
+
+    def _unroutable(self, element: Any) -> None:
+        if self.metrics is not None:
+            self.metrics.unroutable += 1
+        print("DataStream error - Can't process element in stream:"
+              f"{element}")
 
     def process_stream(self, stream: Any) -> None:
+        metrics = self.metrics
         for element in stream:
-            handled = False
-            for proc in self.processors:
-                if proc.can_process(element):
-                    proc.process(element)
-                    handled = True
-                    break
-            if not handled:
-                print("DataStream error - Can't process element in stream:"
-                      f"{element}")
+            proc = self.route(element)
+            if proc is None:
+                self._unroutable(element)
+            elif metrics is None:
+                proc.process(element)
+            else:
+                metrics.ingest(proc, element)
 
     def print_processors_stats(self) -> None:
         print("== DataStream statistics ==")
@@ -52,22 +690,303 @@ class DataStream:
             print("No processor found, no data")
             return
         for proc in self.processors:
+            split = ""
+            if isinstance(proc.buffer, SpillBuffer):
+                split = (f" ({proc.buffer.in_memory} in memory,"
+                         f" {proc.buffer.on_disk} on disk)")
             print(f"{proc.name}: total {proc.total_processed}"
                   f" items processed, remaining {len(proc.buffer)}"
-                  " on processor")
+                  f" on processor{split}")
+
+    def _deliver(self, data: list[tuple[int, str]],
+                 plugin: ExportPlugin | None) -> None:
+        if plugin is not None:
+            plugin.process_output(data)
+            return
+        for sink in self.sinks:
+            sink.send(data)
 
-    def output_pipeline(self, nb: int, plugin: ExportPlugin) -> None:
+    def _check_targets(self, plugin: ExportPlugin | None) -> None:
+        if plugin is None and not self.sinks:
+            raise Exception("No export plugin or sink registered")
+
+    def output_pipeline(self, nb: int,
+                        plugin: ExportPlugin | None = None) -> None:
+        '''Send nb items per processor to plugin, or to every sink'''
+        self._check_targets(plugin)
         for proc in self.processors:
-            data = proc.output(nb)
+            data = self._output(proc, nb)
             if data:
-                plugin.process_output(data)
+                self._deliver(data, plugin)
+
+    def print_sinks_stats(self) -> None:
+        print("== Sink statistics ==")
+        for sink in self.sinks:
+            sink.wait()
+            stats = sink.stats()
+            print(f"{type(sink.plugin).__name__}: {stats['records']}"
+                  f" records in {stats['batches']} batches,"
+                  f" {stats['records_per_s']:.0f} records/s,"
+                  f" max latency {stats['max_latency_s'] * 1000:.2f} ms")
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+    def export_stream(self, plugin: StreamingExportPlugin | None = None,
+                      batch_size: int = 4096) -> int:
+        '''Drain every processor, batch_size items at a time.
+
+        Batches go to plugin, which is opened and closed around the
+        drain, or else to every registered sink (left open until
+        close()).
+        '''
+        self._check_targets(plugin)
+        if plugin is None:
+            try:
+                return self._drain(lambda data: self._deliver(data, None),
+                                   batch_size)
+            finally:
+                for sink in self.sinks:
+                    sink.wait()
+        plugin.open()
+        try:
+            return self._drain(plugin.write_batch, batch_size)
+        finally:
+            plugin.close()
+
+    def _drain(self, write: Callable[[list[tuple[int, str]]], None],
+               batch_size: int) -> int:
+        exported = 0
+        taken = True
+        while taken:
+            taken = False
+            for proc in self.processors:
+                data = self._output(proc, batch_size)
+                if data:
+                    write(data)
+                    exported += len(data)
+                    taken = True
+        return exported
+
+
+class AsyncDataStream(DataStream):
+    '''DataStream fed from an async (or plain) iterator.
+
+    The reader, ingest and export stages are linked by asyncio queues of
+    at most max_pending items. With max_buffered set, ingestion waits
+    while the target processor already holds that many items, so a slow
+    plugin slows the reader down instead of growing the buffers. In that
+    case run the export side concurrently, e.g. with run().
+    '''
+
+    _END = object()
+
+    def __init__(self, max_pending: int = 64,
+                 max_buffered: int | None = None) -> None:
+        super().__init__()
+        self.max_pending = max_pending
+        self.max_buffered = max_buffered
+        self._changed = asyncio.Condition()
+        self._ingesting = 0
+
+    def _has_room(self, proc: DataProcessor) -> bool:
+        return (self.max_buffered is None
+                or len(proc.buffer) < self.max_buffered)
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _read(self, stream: AsyncIterable[Any] | Iterable[Any],
+                    pending: asyncio.Queue) -> None:
+        try:
+            if isinstance(stream, AsyncIterable):
+                async for element in stream:
+                    await pending.put(element)
+            else:
+                for element in stream:
+                    await pending.put(element)
+        finally:
+            await pending.put(self._END)
+
+    async def process_stream(self, stream: Any) -> None:
+        pending: asyncio.Queue = asyncio.Queue(self.max_pending)
+        reader = asyncio.create_task(self._read(stream, pending))
+        self._ingesting += 1
+        try:
+            while (element := await pending.get()) is not self._END:
+                proc = self.route(element)
+                if proc is None:
+                    self._unroutable(element)
+                    continue
+                async with self._changed:
+                    await self._changed.wait_for(
+                        lambda: self._has_room(proc))
+                    self._ingest(proc, element)
+                    self._changed.notify_all()
+        finally:
+            self._ingesting -= 1
+            if not reader.done():
+                reader.cancel()
+            await self._notify()
+        await reader
+
+    async def _export(self, plugin: ExportPlugin,
+                      batches: asyncio.Queue) -> None:
+        while (data := await batches.get()) is not self._END:
+            if asyncio.iscoroutinefunction(plugin.process_output):
+                await plugin.process_output(data)
+            else:
+                await asyncio.to_thread(plugin.process_output, data)
+
+    async def output_pipeline(self, nb: int, plugin: ExportPlugin) -> int:
+        '''Export up to nb items per processor, return how many left'''
+        batches: asyncio.Queue = asyncio.Queue(self.max_pending)
+        sink = asyncio.create_task(self._export(plugin, batches))
+        taken = 0
+        try:
+            for proc in self.processors:
+                data = self._output(proc, nb)
+                if data:
+                    taken += len(data)
+                    await self._notify()
+                    await batches.put(data)
+        finally:
+            await batches.put(self._END)
+            await sink
+        return taken
+
+    async def run(self, stream: Any, nb: int, plugin: ExportPlugin) -> None:
+        '''Ingest stream while exporting batches of nb until all is out'''
+        async def export() -> None:
+            while True:
+                if await self.output_pipeline(nb, plugin):
+                    continue
+                async with self._changed:
+                    await self._changed.wait_for(
+                        lambda: not self._ingesting or any(
+                            proc.buffer for proc in self.processors))
+                    if not self._ingesting and not any(
+                            proc.buffer for proc in self.processors):
+                        return
+
+        ingest = asyncio.create_task(self.process_stream(stream))
+        await asyncio.sleep(0)
+        await asyncio.gather(ingest, export())
+
+
+class Checkpointer:
+    '''Incremental DataStream checkpoints in one append-only file.
+
+    Every processor buffer holds the items numbered output_index to
+    total_processed - 1, so a checkpoint frame only needs both counters
+    plus the items added since the previous frame. The first frame, and
+    every 'compact_every' frames, is a full snapshot written to a fresh
+    file that atomically replaces the old one. restore() maps the file
+    with mmap and replays the frames; a torn last frame is ignored.
+    '''
+
+    MAGIC = b"CNX1"
+    HEADER = struct.Struct("<4s?I")
+
+    def __init__(self, path: str, compact_every: int = 64) -> None:
+        self.path = path
+        self.compact_every = compact_every
+        self.frames = 0
+        self._saved: dict[str, int] = {}
+
+    def _state(self, ds: DataStream,
+               full: bool) -> list[tuple[str, int, int, int, list[Any]]]:
+        state = []
+        for proc in ds.processors:
+            total = proc.total_processed
+            start = proc.output_index if full else max(
+                self._saved.get(proc.name, 0), proc.output_index)
+            items = proc.buffer.tail(total - start) if total > start else []
+            state.append((proc.name, proc.output_index, total, start, items))
+        return state
+
+    def _frame(self, ds: DataStream, full: bool) -> bytes:
+        state = self._state(ds, full)
+        payload = marshal.dumps(state)
+        for name, _, total, _, _ in state:
+            self._saved[name] = total
+        return self.HEADER.pack(self.MAGIC, full, len(payload)) + payload
+
+    def save(self, ds: DataStream) -> int:
+        '''Write a checkpoint frame, return its size in bytes'''
+        full = self.frames == 0 or self.frames >= self.compact_every
+        frame = self._frame(ds, full)
+        if full:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(frame)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+            self.frames = 1
+        else:
+            with open(self.path, "ab") as file:
+                file.write(frame)
+                file.flush()
+                os.fsync(file.fileno())
+            self.frames += 1
+        return len(frame)
+
+    def _frames(self, data: mmap.mmap) -> Iterator[tuple[bool, Any, int]]:
+        offset = 0
+        while offset + self.HEADER.size <= len(data):
+            magic, full, size = self.HEADER.unpack_from(data, offset)
+            start = offset + self.HEADER.size
+            if magic != self.MAGIC or start + size > len(data):
+                return
+            offset = start + size
+            yield full, marshal.loads(data[start:offset]), offset
+
+    def restore(self, ds: DataStream) -> None:
+        '''Load the saved state into ds (same processor names)'''
+        counters: dict[str, tuple[int, int]] = {}
+        segments: dict[str, list[tuple[int, list[Any]]]] = {}
+        frames = 0
+        end = 0
+        if os.path.getsize(self.path) == 0:
+            raise Exception(f"Empty checkpoint '{self.path}'")
+        with open(self.path, "rb") as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            size = len(data)
+            for full, state, end in self._frames(data):
+                if full:
+                    segments.clear()
+                frames += 1
+                for name, output_index, total, start, items in state:
+                    counters[name] = (output_index, total)
+                    segments.setdefault(name, []).append((start, items))
+        if end < size:
+            os.truncate(self.path, end)
+
+        by_name = {proc.name: proc for proc in ds.processors}
+        missing = set(counters) - set(by_name)
+        if missing:
+            raise Exception(f"No processor for checkpoint of {missing}")
+        for name, (output_index, total) in counters.items():
+            proc = by_name[name]
+            proc.buffer.take(len(proc.buffer))
+            for start, items in segments.get(name, []):
+                if start + len(items) > output_index:
+                    proc.buffer.extend(items[max(0, output_index - start):])
+            proc.output_index = output_index
+            proc.total_processed = total
+            self._saved[name] = total
+        self.frames = frames
 
 
 class NumericProcessor(DataProcessor):
-    def __init__(self) -> None:
+    def __init__(self, spill_threshold: int | None = None,
+                 spill_dir: str | None = None) -> None:
         self.name = "Numeric Processor"
         self.total_processed = 0
-        self.buffer: list[float] = []
+        self.buffer = make_buffer(spill_threshold, spill_dir)
         self.output_index = 0
 
     def can_process(self, data: Any) -> bool:
@@ -86,8 +1005,7 @@ class NumericProcessor(DataProcessor):
             self.total_processed += 1
 
     def output(self, n: int) -> list[tuple[int, str]]:
-        taken = self.buffer[:n]
-        self.buffer = self.buffer[n:]
+        taken = self.buffer.take(n)
         result = []
         for value in taken:
             result.append((self.output_index, str(value)))
@@ -96,11 +1014,12 @@ class NumericProcessor(DataProcessor):
 
 
 class TextProcessor(DataProcessor):
-    def __init__(self) -> None:
+    def __init__(self, spill_threshold: int | None = None,
+                 spill_dir: str | None = None) -> None:
         self.name = "Text Processor"
         self.total_processed = 0
         self.output_index = 0
-        self.buffer: list[str] = []
+        self.buffer = make_buffer(spill_threshold, spill_dir)
 
     def can_process(self, data: Any) -> bool:
         return (
@@ -117,8 +1036,7 @@ class TextProcessor(DataProcessor):
             self.total_processed += 1
 
     def output(self, n: int) -> list[tuple[int, str]]:
-        taken = self.buffer[:n]
-        self.buffer = self.buffer[n:]
+        taken = self.buffer.take(n)
         result = []
         for value in taken:
             result.append((self.output_index, str(value)))
@@ -127,10 +1045,13 @@ class TextProcessor(DataProcessor):
 
 
 class LogProcessor(DataProcessor):
-    def __init__(self) -> None:
+    def __init__(self, formatter: LogFormatter | None = None,
+                 spill_threshold: int | None = None,
+                 spill_dir: str | None = None) -> None:
         self.name = "Log Processor"
+        self.formatter = formatter or LogFormatter()
         self.total_processed = 0
-        self.buffer: list[dict[str, Any]] = []
+        self.buffer = make_buffer(spill_threshold, spill_dir)
         self.output_index = 0
 
     def can_process(self, data: Any) -> bool:
@@ -142,15 +1063,11 @@ class LogProcessor(DataProcessor):
         self.total_processed += len(data)
 
     def output(self, n: int) -> list[tuple[int, str]]:
-        taken = self.buffer[:n]
-        self.buffer = self.buffer[n:]
-
-        result = []
-        for log in taken:
-            formatted = f"{log['log_level']}: {log['log_message']}"
-            result.append((self.output_index, formatted))
-            self.output_index += 1
-        return result
+        taken = self.buffer.take(n)
+        start = self.output_index
+        self.output_index += len(taken)
+        return list(zip(range(start, self.output_index),
+                        self.formatter.format_batch(taken)))
 
 
 # “If it walks like a duck and quacks like a duck, it’s a duck.”
@@ -164,10 +1081,92 @@ class CSVPlugin:
 class JSONPlugin:
     def process_output(self, data: list[tuple[int, str]]) -> None:
         print("JSON Output:")
-        items = [f'"item_{i}": "{v}"' for i, v in data]
+        items = [f'"item_{i}": {json.dumps(v)}' for i, v in data]
         print("{" + ", ".join(items) + "}")
 
 
+class BufferedWriter(ABC):
+    '''Base for streaming plugins writing UTF-8 to a binary handle.
+
+    Text is staged in a StringIO and only encoded and written once
+    buffer_size characters are pending, so memory stays constant no
+    matter how many records go through. The handle is flushed, not
+    closed, by close().
+    '''
+
+    def __init__(self, handle: BinaryIO, buffer_size: int = 1 << 16) -> None:
+        self.handle = handle
+        self.buffer_size = buffer_size
+        self.records = 0
+        self._pending = io.StringIO()
+
+    def open(self) -> None:
+        pass
+
+    @abstractmethod
+    def _format(self, data: Iterable[tuple[int, str]]) -> None:
+        pass
+
+    def write_batch(self, data: Iterable[tuple[int, str]]) -> None:
+        self._format(data)
+        if self._pending.tell() >= self.buffer_size:
+            self.flush()
+
+    def process_output(self, data: list[tuple[int, str]]) -> None:
+        self.write_batch(data)
+
+    def flush(self) -> None:
+        text = self._pending.getvalue()
+        if text:
+            self.handle.write(text.encode("utf-8"))
+            self._pending.seek(0)
+            self._pending.truncate()
+
+    def close(self) -> None:
+        self.flush()
+        self.handle.flush()
+
+    def __enter__(self) -> "BufferedWriter":
+        self.open()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class CSVWriter(BufferedWriter):
+    def __init__(self, handle: BinaryIO, buffer_size: int = 1 << 16,
+                 header: bool = True) -> None:
+        super().__init__(handle, buffer_size)
+        self.header = header
+        self._header_written = False
+        self._csv = csv.writer(self._pending, lineterminator="\n")
+
+    def open(self) -> None:
+        '''Write the header, once per handle however often it is opened'''
+        if self.header and not self._header_written:
+            self._csv.writerow(("index", "value"))
+            self._header_written = True
+
+    def _format(self, data: Iterable[tuple[int, str]]) -> None:
+        rows = data if isinstance(data, list) else list(data)
+        self._csv.writerows(rows)
+        self.records += len(rows)
+
+
+class JSONLinesWriter(BufferedWriter):
+    def __init__(self, handle: BinaryIO, buffer_size: int = 1 << 16) -> None:
+        super().__init__(handle, buffer_size)
+        self._encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    def _format(self, data: Iterable[tuple[int, str]]) -> None:
+        encode = self._encode
+        write = self._pending.write
+        for index, value in data:
+            write(f'{{"index": {index}, "value": {encode(value)}}}\n')
+            self.records += 1
+
+
 if __name__ == "__main__":
     print("=== Code Nexus - Data Pipeline ===")
     ds = DataStream()